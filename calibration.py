@@ -1,9 +1,326 @@
 import cv2
 import numpy as np
 import os
+import queue
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
 from ultralytics import YOLO
-from utils import config
+from utils import config, load_opencv_yaml, save_opencv_yaml
+
+
+MOSAIC_BLOCK_SIZE = 20
+
+# 角点检测模型的输入尺寸（导出TensorRT引擎与推理时保持一致）
+YOLO_IMGSZ = 640
+
+# 起始帧预览缓存的最大帧数（720p约2.6MB/帧）
+PREVIEW_CACHE_SIZE = 32
+
+# 外参求解时RANSAC判定内点的最大重投影误差（像素）
+PNP_REPROJECTION_ERROR = 3.0
+
+# 摄像头预览画面的最短刷新间隔（秒），约30fps
+PREVIEW_DISPLAY_INTERVAL = 1 / 30
+
+# 点选界面：四个角点共用一个放大窗口；画面无变化时只轮询按键
+ZOOM_WINDOW = "Zoom Selection"
+SELECTION_WAIT_MS = 15
+
+
+def create_mosaic_image(image, block_size=MOSAIC_BLOCK_SIZE):
+    """
+    生成马赛克图像（向量化块平均）
+
+    参数:
+        image: 输入BGR图像
+        block_size: 马赛克块大小（像素）
+
+    返回:
+        与输入同尺寸的马赛克图像，不足一整块的边缘区域保持原像素
+    """
+    h, w = image.shape[:2]
+    bh, bw = h // block_size, w // block_size
+    if bh == 0 or bw == 0:
+        return image.copy()
+
+    # 仅复制不足一整块的右侧/底部边缘，整块区域随后整体覆盖
+    ch, cw = bh * block_size, bw * block_size
+    mosaic_img = np.empty_like(image)
+    mosaic_img[ch:] = image[ch:]
+    mosaic_img[:ch, cw:] = image[:ch, cw:]
+
+    # 裁剪到整块区域后按块求均值，整数倍 INTER_AREA 缩放即为块平均（OpenCV多线程内核，无浮点中间数组）
+    block_colors = cv2.resize(image[:ch, :cw], (bw, bh), interpolation=cv2.INTER_AREA)
+
+    # 整数倍最近邻放大回原尺寸，每个块填充为其均值
+    blocks = cv2.resize(block_colors, (cw, ch), interpolation=cv2.INTER_NEAREST)
+    if blocks.ndim < image.ndim:
+        blocks = blocks[..., np.newaxis]
+    mosaic_img[:ch, :cw] = blocks
+    return mosaic_img
+
+
+# 标定引导界面的说明文字（摄像头引导中的运行参数行单独绘制）
+VIDEO_GUIDE_TEXTS = (
+    "Badminton Court Calibration",
+    "",
+    "1. First frame will be shown for selecting court corners",
+    "2. Right-click near each corner to select precise position",
+    "3. Follow order: Bottom Left, Bottom Right, Top Right, Top Left",
+    "4. After corner selection, automatic court point detection will run",
+    "",
+    "Press SPACE to continue..."
+)
+CAMERA_GUIDE_TEXTS = (
+    "Badminton Court Camera Calibration",
+    "",
+    "1. Camera live feed will be shown for selecting court corners",
+    "2. Right-click near each corner to select precise position",
+    "3. Follow order: Bottom Left, Bottom Right, Top Right, Top Left",
+    "4. After corner selection, automatic court point detection will run",
+    "",
+    "",  # 预览时间（运行时绘制）
+    "",  # 检测帧数（运行时绘制）
+    "",
+    "Press SPACE to continue..."
+)
+
+
+@lru_cache(maxsize=None)
+def render_guide_image(texts, top):
+    """
+    绘制800x600的标定引导图（按文字内容缓存，只渲染一次）
+
+    返回的图像为只读，需要叠加内容时先复制。
+    """
+    guide_img = np.zeros((600, 800, 3), dtype=np.uint8)
+    for i, text in enumerate(texts):
+        cv2.putText(guide_img, text, (50, top + i * 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+    guide_img.flags.writeable = False
+    return guide_img
+
+
+# 已加载的YOLO模型，按 (路径, 设备, 任务) 共享，两台相机的标定器不再重复加载同一权重
+_YOLO_MODEL_CACHE = {}
+_YOLO_MODEL_CACHE_LOCK = threading.Lock()
+
+
+def get_yolo_model(model_path, device='cpu', task='pose'):
+    """获取共享的YOLO模型实例，首次请求时加载（并发请求只加载一次）"""
+    key = (model_path, str(device), task)
+    with _YOLO_MODEL_CACHE_LOCK:
+        if key not in _YOLO_MODEL_CACHE:
+            _YOLO_MODEL_CACHE[key] = load_yolo_model(model_path, device, task)
+        return _YOLO_MODEL_CACHE[key]
+
+
+def load_yolo_model(model_path, device='cpu', task='pose', imgsz=YOLO_IMGSZ, batch=16, half=True):
+    """
+    加载YOLO模型，CUDA设备上自动导出并复用TensorRT引擎
+
+    FP16关键点回归误差远小于 consolidate_corner_points 的30像素聚类阈值，
+    因此半精度引擎不影响标定结果。
+
+    参数:
+        model_path: .pt 或 .engine 模型路径
+        device: 运行设备 ('cpu' 或 'cuda')
+        task: 模型任务类型（.engine 文件无法自动推断）
+        imgsz: 导出引擎的输入尺寸
+        batch: 导出引擎支持的最大批大小
+        half: 是否使用FP16精度
+    """
+    if model_path.endswith('.engine'):
+        return YOLO(model_path, task=task)
+
+    if not str(device).startswith('cuda'):
+        return YOLO(model_path)
+
+    # 引擎缓存在 .pt 文件旁，文件名包含导出参数，参数不变时跳过重新导出
+    precision = 'fp16' if half else 'fp32'
+    engine_path = f"{os.path.splitext(model_path)[0]}_{imgsz}_b{batch}_{precision}.engine"
+
+    if not os.path.exists(engine_path):
+        try:
+            print(f"⚙️ Exporting TensorRT engine ({precision}, imgsz={imgsz}, batch={batch})...")
+            exported_path = YOLO(model_path).export(format='engine', half=half, dynamic=True,
+                                                    batch=batch, imgsz=imgsz, device=device)
+            os.replace(exported_path, engine_path)
+            print(f"✅ TensorRT engine cached: {engine_path}")
+        except Exception as e:
+            print(f"⚠️ TensorRT export failed, using PyTorch model: {e}")
+            return YOLO(model_path)
+
+    return YOLO(engine_path, task=task)
+
+
+# 场地3D点坐标，仅使用近半场点 (Y=0 到 670)
+COURT_3D_POINTS = np.array([
+    # 底线区域 (Y = 0 to 4)
+    [0, 0, 0], [610, 0, 0],  # 外角点
+    [4, 4, 0], [606, 4, 0],  # 内角点
+    [46, 4, 0], [50, 4, 0],  # 左单打边线交点
+    [303, 4, 0], [307, 4, 0],  # 中线交点
+    [560, 4, 0], [564, 4, 0],  # 右单打边线交点
+
+    # 双打后发球线区域 (Y = 76 to 80)
+    [4, 76, 0], [4, 80, 0],  # 左双打边线交点
+    [46, 76, 0], [50, 76, 0], [46, 80, 0], [50, 80, 0],  # 左单打十字交点
+    [303, 76, 0], [307, 76, 0], [303, 80, 0], [307, 80, 0],  # 中线十字交点
+    [560, 76, 0], [564, 76, 0], [560, 80, 0], [564, 80, 0],  # 右单打十字交点
+    [606, 76, 0], [606, 80, 0],  # 右双打边线交点
+
+    # 前发球线区域 (Y = 468 to 472)
+    [4, 468, 0], [4, 472, 0],  # 左双打边线交点
+    [46, 468, 0], [50, 468, 0], [46, 472, 0], [50, 472, 0],  # 左单打十字交点
+    [303, 468, 0], [307, 468, 0], [303, 472, 0], [307, 472, 0],  # 中线十字交点
+    [560, 468, 0], [564, 468, 0], [560, 472, 0], [564, 472, 0],  # 右单打十字交点
+    [606, 468, 0], [606, 472, 0],  # 右双打边线交点
+], dtype=np.float32)
+
+# 为每个点添加标签，便于匹配和验证
+COURT_POINT_LABELS = [
+    "Bottom Left Outer", "Bottom Right Outer",
+    "Bottom Left Inner", "Bottom Right Inner",
+    "Left Singles Bottom Left", "Left Singles Bottom Right",
+    "Center Line Bottom Left", "Center Line Bottom Right",
+    "Right Singles Bottom Left", "Right Singles Bottom Right",
+
+    "Left Doubles Back Service Bottom", "Left Doubles Back Service Top",
+    "Left Singles Back Service Bottom Left", "Left Singles Back Service Bottom Right",
+    "Left Singles Back Service Top Left", "Left Singles Back Service Top Right",
+    "Center Line Back Service Bottom Left", "Center Line Back Service Bottom Right",
+    "Center Line Back Service Top Left", "Center Line Back Service Top Right",
+    "Right Singles Back Service Bottom Left", "Right Singles Back Service Bottom Right",
+    "Right Singles Back Service Top Left", "Right Singles Back Service Top Right",
+    "Right Doubles Back Service Bottom", "Right Doubles Back Service Top",
+
+    "Left Doubles Front Service Bottom", "Left Doubles Front Service Top",
+    "Left Singles Front Service Bottom Left", "Left Singles Front Service Bottom Right",
+    "Left Singles Front Service Top Left", "Left Singles Front Service Top Right",
+    "Center Line Front Service Bottom Left", "Center Line Front Service Bottom Right",
+    "Center Line Front Service Top Left", "Center Line Front Service Top Right",
+    "Right Singles Front Service Bottom Left", "Right Singles Front Service Bottom Right",
+    "Right Singles Front Service Top Left", "Right Singles Front Service Top Right",
+    "Right Doubles Front Service Bottom", "Right Doubles Front Service Top"
+]
+
+# 合并后的点集（将相近的十字角点合并为一个点），前四个为手动选择的外角点
+MERGED_COURT_POINTS = np.array([
+    # 四个外角点 - 这些会被手动选择
+    [0, 0, 0], [610, 0, 0], [606, 472, 0], [4, 472, 0],
+    # 额外的两个点
+    [610, 472, 0], [0, 472, 0],
+    # 左单打/中线/右单打边线底点（合并）
+    [48, 4, 0], [305, 4, 0], [562, 4, 0],
+    # 后发球线交点（合并）- 如左双打从 (4, 76), (4, 80) 到 (4, 78)
+    [4, 78, 0], [48, 78, 0], [305, 78, 0], [562, 78, 0], [606, 78, 0],
+    # 前发球线交点（合并）
+    # 注意：我们不将 (4, 472), (606, 472) 合并进来，因为它们是手动选择的点
+    [4, 470, 0], [48, 470, 0], [305, 470, 0], [562, 470, 0], [606, 470, 0],
+], dtype=np.float32)
+
+MERGED_POINT_LABELS = [f"({x}, {y}, {z})" for x, y, z in MERGED_COURT_POINTS.astype(int)]
+MERGED_POINT_INDEX = {label: i for i, label in enumerate(MERGED_POINT_LABELS)}
+
+# 合并点的场地平面坐标 (z=0)，形状 (M, 1, 2)，直接用于 cv2.perspectiveTransform
+MERGED_COURT_POINTS_2D = np.ascontiguousarray(MERGED_COURT_POINTS[:, :2]).reshape(-1, 1, 2)
+
+# 手动选择的四个角点，顺序与 select_initial_court_boundary 的点击顺序一致
+MANUAL_CORNER_LABELS = ["(0, 0, 0)", "(610, 0, 0)", "(606, 472, 0)", "(4, 472, 0)"]
+MANUAL_CORNER_INDICES = [MERGED_POINT_INDEX[label] for label in MANUAL_CORNER_LABELS]
+
+# 场地线段对（每对线段定义一条4cm宽的线），形状 (P, 4, 3)，顺序为 start1, end1, start2, end2
+COURT_LINE_ENDPOINTS = np.array([
+    # 底线对
+    [[0, 0, 0], [610, 0, 0], [4, 4, 0], [606, 4, 0]],
+    # 左双打边线
+    [[0, 0, 0], [0, 472, 0], [4, 4, 0], [4, 472, 0]],
+    # 右双打边线
+    [[610, 0, 0], [610, 472, 0], [606, 4, 0], [606, 472, 0]],
+    # 左单打边线
+    [[46, 4, 0], [46, 472, 0], [50, 4, 0], [50, 472, 0]],
+    # 右单打边线
+    [[560, 4, 0], [560, 472, 0], [564, 4, 0], [564, 472, 0]],
+    # 中线
+    [[303, 4, 0], [303, 472, 0], [307, 4, 0], [307, 472, 0]],
+    # 后发球线
+    [[4, 76, 0], [606, 76, 0], [4, 80, 0], [606, 80, 0]],
+    # 前发球线
+    [[4, 468, 0], [606, 468, 0], [4, 472, 0], [606, 472, 0]],
+    # 顶线对
+    [[0, 472, 0], [610, 472, 0], [4, 472, 0], [606, 472, 0]],
+], dtype=np.float32)
+
+
+class PreviewFrameCache:
+    """
+    起始帧预览的解码帧缓存（LRU）
+
+    拖动轨迹条时 cap.set + read 需要从关键帧重新解码。后台线程用独立的
+    VideoCapture 顺序解码，按固定间隔预存候选帧；未命中时再同步定位读取。
+    """
+
+    def __init__(self, cap, video_path, last_frame, capacity=PREVIEW_CACHE_SIZE):
+        self.cap = cap
+        self.capacity = capacity
+        self.frames = OrderedDict()
+        self.lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        # 候选帧占一半容量，另一半留给用户实际浏览过的帧
+        self.stride = max(1, (last_frame + 1) // max(1, capacity // 2))
+        self._thread = threading.Thread(target=self._predecode, args=(video_path, last_frame), daemon=True)
+        self._thread.start()
+
+    def _predecode(self, video_path, last_frame):
+        """顺序解码视频，只保留间隔为 stride 的帧"""
+        reader = cv2.VideoCapture(video_path)
+        index = 0
+        while index <= last_frame and not self._stop_event.is_set():
+            if index % self.stride == 0:
+                ret, frame = reader.read()
+                if not ret:
+                    break
+                self._put(index, frame)
+            elif not reader.grab():
+                break
+            index += 1
+        reader.release()
+
+    def _put(self, index, frame):
+        with self.lock:
+            self.frames[index] = frame
+            self.frames.move_to_end(index)
+            while len(self.frames) > self.capacity:
+                self.frames.popitem(last=False)
+
+    def get(self, index):
+        """获取指定帧，未命中时同步定位读取并加入缓存"""
+        with self.lock:
+            frame = self.frames.get(index)
+            if frame is not None:
+                self.frames.move_to_end(index)
+                return frame
+
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        self._put(index, frame)
+        return frame
+
+    def close(self):
+        """停止后台解码并释放缓存"""
+        self._stop_event.set()
+        self._thread.join()
+        self.frames.clear()
 
 
 class BadmintonCalibrator:
@@ -22,153 +339,50 @@ class BadmintonCalibrator:
         self.court_3d_points, self.court_point_labels, self.merged_3d_points, self.merged_point_labels = self.setup_court_points()
         self.current_image = None
         self.matched_corners = {}
-        self.yolo_model = YOLO(yolo_model_path)
+        self.yolo_model = get_yolo_model(yolo_model_path, device)
         self.device = device
+        # CUDA上以FP16推理（TensorRT引擎本身即为FP16；导出失败回退到 .pt 时同样生效）
+        self.use_half = str(device).startswith('cuda')
         self.homography_matrix = None
         self.manual_corners = []  # 存储手动选择的四个点
+        self.session_mosaic = None  # 马赛克背景缓存（每次会话只计算一次）
+        self.initial_homography = None
+        self.initial_homography_inv = None  # 图像平面 <- 场地平面，选点后计算一次
+        self.boundary_pts = None  # 手动选择的四个边界点 (4, 2) int32
+        self.mask = None  # 场地掩码（会话内不变）
         self.camera_params_file = camera_params_file
 
     def load_camera_params(self, params_file):
         """从文件加载相机内参"""
-        fs = cv2.FileStorage(params_file, cv2.FILE_STORAGE_READ)
-        self.camera_matrix = fs.getNode("camera_matrix").mat()
-        self.dist_coeffs = fs.getNode("distortion_coefficients").mat().flatten()
-        self.image_width = int(fs.getNode("image_width").real() or 1280)
-        self.image_height = int(fs.getNode("image_height").real() or 720)
-        fs.release()
+        params = load_opencv_yaml(params_file)
+        self.camera_matrix = params["camera_matrix"]
+        self.dist_coeffs = np.asarray(params["distortion_coefficients"]).flatten()
+        self.image_width = int(params.get("image_width") or 1280)
+        self.image_height = int(params.get("image_height") or 720)
+
+        # 预先计算去畸变映射表，后续逐帧只需一次 remap
+        self._build_undistort_maps(self.image_width, self.image_height)
 
         print(f"Camera parameters loaded from: {params_file}")
         print(f"Camera matrix: \n{self.camera_matrix}")
         print(f"Distortion coefficients: {self.dist_coeffs}")
 
-    def setup_court_points(self):
-        """设置场地3D点坐标"""
-        # 仅使用近半场点 (Y=0 到 670)
-        pts = np.array([
-            # 底线区域 (Y = 0 to 4)
-            [0, 0, 0], [610, 0, 0],  # 外角点
-            [4, 4, 0], [606, 4, 0],  # 内角点
-            [46, 4, 0], [50, 4, 0],  # 左单打边线交点
-            [303, 4, 0], [307, 4, 0],  # 中线交点
-            [560, 4, 0], [564, 4, 0],  # 右单打边线交点
-
-            # 双打后发球线区域 (Y = 76 to 80)
-            [4, 76, 0], [4, 80, 0],  # 左双打边线交点
-            [46, 76, 0], [50, 76, 0], [46, 80, 0], [50, 80, 0],  # 左单打十字交点
-            [303, 76, 0], [307, 76, 0], [303, 80, 0], [307, 80, 0],  # 中线十字交点
-            [560, 76, 0], [564, 76, 0], [560, 80, 0], [564, 80, 0],  # 右单打十字交点
-            [606, 76, 0], [606, 80, 0],  # 右双打边线交点
-
-            # 前发球线区域 (Y = 468 to 472)
-            [4, 468, 0], [4, 472, 0],  # 左双打边线交点
-            [46, 468, 0], [50, 468, 0], [46, 472, 0], [50, 472, 0],  # 左单打十字交点
-            [303, 468, 0], [307, 468, 0], [303, 472, 0], [307, 472, 0],  # 中线十字交点
-            [560, 468, 0], [564, 468, 0], [560, 472, 0], [564, 472, 0],  # 右单打十字交点
-            [606, 468, 0], [606, 472, 0],  # 右双打边线交点
-        ], dtype=np.float32)
+    def _build_undistort_maps(self, width, height):
+        """计算并缓存指定分辨率的去畸变映射表"""
+        self.map1, self.map2 = cv2.initUndistortRectifyMap(
+            self.camera_matrix, self.dist_coeffs, None, self.camera_matrix, (width, height), cv2.CV_16SC2)
+        self.undistort_size = (width, height)
 
-        # 为每个点添加标签，便于匹配和验证
-        labels = [
-            "Bottom Left Outer", "Bottom Right Outer",
-            "Bottom Left Inner", "Bottom Right Inner",
-            "Left Singles Bottom Left", "Left Singles Bottom Right",
-            "Center Line Bottom Left", "Center Line Bottom Right",
-            "Right Singles Bottom Left", "Right Singles Bottom Right",
-
-            "Left Doubles Back Service Bottom", "Left Doubles Back Service Top",
-            "Left Singles Back Service Bottom Left", "Left Singles Back Service Bottom Right",
-            "Left Singles Back Service Top Left", "Left Singles Back Service Top Right",
-            "Center Line Back Service Bottom Left", "Center Line Back Service Bottom Right",
-            "Center Line Back Service Top Left", "Center Line Back Service Top Right",
-            "Right Singles Back Service Bottom Left", "Right Singles Back Service Bottom Right",
-            "Right Singles Back Service Top Left", "Right Singles Back Service Top Right",
-            "Right Doubles Back Service Bottom", "Right Doubles Back Service Top",
-
-            "Left Doubles Front Service Bottom", "Left Doubles Front Service Top",
-            "Left Singles Front Service Bottom Left", "Left Singles Front Service Bottom Right",
-            "Left Singles Front Service Top Left", "Left Singles Front Service Top Right",
-            "Center Line Front Service Bottom Left", "Center Line Front Service Bottom Right",
-            "Center Line Front Service Top Left", "Center Line Front Service Top Right",
-            "Right Singles Front Service Bottom Left", "Right Singles Front Service Bottom Right",
-            "Right Singles Front Service Top Left", "Right Singles Front Service Top Right",
-            "Right Doubles Front Service Bottom", "Right Doubles Front Service Top"
-        ]
+    def undistort(self, frame):
+        """使用缓存的映射表对帧去畸变（保持原相机矩阵）"""
+        h, w = frame.shape[:2]
+        if self.undistort_size != (w, h):
+            self._build_undistort_maps(w, h)
+        return cv2.remap(frame, self.map1, self.map2, cv2.INTER_LINEAR)
 
-        # 创建合并后的点集（将相近的十字角点合并为一个点）
-        merged_pts = []
-        merged_labels = []
-
-        # 添加四个外角点 - 这些会被手动选择
-        merged_pts.append([0, 0, 0])
-        merged_labels.append("(0, 0, 0)")
-        merged_pts.append([610, 0, 0])
-        merged_labels.append("(610, 0, 0)")
-        merged_pts.append([606, 472, 0])
-        merged_labels.append("(606, 472, 0)")
-        merged_pts.append([4, 472, 0])
-        merged_labels.append("(4, 472, 0)")
-
-        # 添加额外的两个点
-        merged_pts.append([610, 472, 0])
-        merged_labels.append("(610, 472, 0)")
-        merged_pts.append([0, 472, 0])
-        merged_labels.append("(0, 472, 0)")
-
-        # 添加左单打边线底点（合并）
-        merged_pts.append([48, 4, 0])
-        merged_labels.append("(48, 4, 0)")
-
-        # 添加中线底点（合并）
-        merged_pts.append([305, 4, 0])
-        merged_labels.append("(305, 4, 0)")
-
-        # 添加右单打边线底点（合并）
-        merged_pts.append([562, 4, 0])
-        merged_labels.append("(562, 4, 0)")
-
-        # 添加左双打后发球线交点（合并）- 从 (4, 76), (4, 80) 到 (4, 78)
-        merged_pts.append([4, 78, 0])
-        merged_labels.append("(4, 78, 0)")
-
-        # 添加左单打后发球线交点（合并）
-        merged_pts.append([48, 78, 0])
-        merged_labels.append("(48, 78, 0)")
-
-        # 添加中线后发球线交点（合并）
-        merged_pts.append([305, 78, 0])
-        merged_labels.append("(305, 78, 0)")
-
-        # 添加右单打后发球线交点（合并）
-        merged_pts.append([562, 78, 0])
-        merged_labels.append("(562, 78, 0)")
-
-        # 添加右双打后发球线交点（合并）- 从 (606, 76), (606, 80) 到 (606, 78)
-        merged_pts.append([606, 78, 0])
-        merged_labels.append("(606, 78, 0)")
-
-        # 添加左双打前发球线交点（合并）- 从 (4, 468), (4, 472) 到 (4, 470)
-        # 注意：我们不将 (4, 472) 合并进来，因为它是手动选择的点之一
-        merged_pts.append([4, 470, 0])
-        merged_labels.append("(4, 470, 0)")
-
-        # 添加左单打前发球线交点（合并）
-        merged_pts.append([48, 470, 0])
-        merged_labels.append("(48, 470, 0)")
-
-        # 添加中线前发球线交点（合并）
-        merged_pts.append([305, 470, 0])
-        merged_labels.append("(305, 470, 0)")
-
-        # 添加右单打前发球线交点（合并）
-        merged_pts.append([562, 470, 0])
-        merged_labels.append("(562, 470, 0)")
-
-        # 添加右双打前发球线交点（合并）
-        # 注意：我们不将 (606, 472) 合并进来，因为它是手动选择的点之一
-        merged_pts.append([606, 470, 0])
-        merged_labels.append("(606, 470, 0)")
-
-        return pts, labels, np.array(merged_pts, dtype=np.float32), merged_labels
+    def setup_court_points(self):
+        """设置场地3D点坐标（共享模块级常量数组，不再逐次构建）"""
+        return COURT_3D_POINTS, COURT_POINT_LABELS, MERGED_COURT_POINTS, MERGED_POINT_LABELS
 
     def zoom_point_selection(self, image, roi_x, roi_y, zoom_radius, point_name):
         """放大区域进行精确点选择，使用左键在放大区域中选择点"""
@@ -179,52 +393,53 @@ class BadmintonCalibrator:
         x2 = min(w, roi_x + zoom_radius)
         y2 = min(h, roi_y + zoom_radius)
 
-        zoom_img = image[y1:y2, x1:x2].copy()
+        # 预先绘制指导信息和中心十字线，作为后续每次重绘的底图
+        base = image[y1:y2, x1:x2].copy()
+        text = f"Click exactly on the {point_name}"
+        text_size, _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)
+        cv2.rectangle(base, (10, 30), (10 + text_size[0] + 10, 70), (0, 0, 0), -1)
+        cv2.putText(base, text, (15, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
 
-        # 创建放大窗口
-        window = f"Zoom Selection - {point_name}"
-        cv2.namedWindow(window, cv2.WINDOW_NORMAL)
-        cv2.resizeWindow(window, 800, 800)
+        # 添加一个十字线或圆形标记在图像中心，帮助定位
+        center_x, center_y = base.shape[1] // 2, base.shape[0] // 2
+        cv2.line(base, (center_x - 10, center_y), (center_x + 10, center_y), (0, 255, 255), 1)
+        cv2.line(base, (center_x, center_y - 10), (center_x, center_y + 10), (0, 255, 255), 1)
+
+        # 复用同一个放大窗口，只更新标题（窗口已存在时namedWindow不会重建）
+        cv2.namedWindow(ZOOM_WINDOW, cv2.WINDOW_NORMAL)
+        cv2.resizeWindow(ZOOM_WINDOW, 800, 800)
+        cv2.setWindowTitle(ZOOM_WINDOW, f"Zoom Selection - {point_name}")
 
         selected_point = [None]
+        dirty = [True]
 
         def mouse_cb(event, x, y, flags, param):
             if event == cv2.EVENT_LBUTTONDOWN:
                 selected_point[0] = (x, y)
+                dirty[0] = True
 
-        cv2.setMouseCallback(window, mouse_cb)
-
-        # 显示指导信息
-        disp = zoom_img.copy()
-        text = f"Click exactly on the {point_name}"
-        text_size, _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)
-        cv2.rectangle(disp, (10, 30), (10 + text_size[0] + 10, 70), (0, 0, 0), -1)
-        cv2.putText(disp, text, (15, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
-
-        # 添加一个十字线或圆形标记在图像中心，帮助定位
-        center_x, center_y = zoom_img.shape[1] // 2, zoom_img.shape[0] // 2
-        cv2.line(disp, (center_x - 10, center_y), (center_x + 10, center_y), (0, 255, 255), 1)
-        cv2.line(disp, (center_x, center_y - 10), (center_x, center_y + 10), (0, 255, 255), 1)
+        cv2.setMouseCallback(ZOOM_WINDOW, mouse_cb)
 
         while True:
-            # 如果有选择的点，画出来
-            if selected_point[0] is not None:
-                disp = zoom_img.copy()
-                cv2.putText(disp, text, (15, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
-                cv2.circle(disp, selected_point[0], 5, (0, 255, 255), -1)
-                cv2.putText(disp, "Press SPACE to confirm or ESC to re-select",
-                            (15, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-
-            cv2.imshow(window, disp)
-            key = cv2.waitKey(1) & 0xFF
+            # 仅在选择变化时重绘，否则只轮询按键
+            if dirty[0]:
+                disp = base
+                if selected_point[0] is not None:
+                    disp = base.copy()
+                    cv2.circle(disp, selected_point[0], 5, (0, 255, 255), -1)
+                    cv2.putText(disp, "Press SPACE to confirm or ESC to re-select",
+                                (15, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+                cv2.imshow(ZOOM_WINDOW, disp)
+                dirty[0] = False
+
+            key = cv2.waitKey(SELECTION_WAIT_MS) & 0xFF
 
             if key == 27:  # ESC
                 selected_point[0] = None  # 重置
+                dirty[0] = True
             elif key == ord(' ') and selected_point[0] is not None:  # SPACE
                 break
 
-        cv2.destroyWindow(window)
-
         # 如果用户选择了点，转换回原图坐标
         if selected_point[0] is not None:
             global_x = x1 + selected_point[0][0]
@@ -273,79 +488,58 @@ class BadmintonCalibrator:
 
         cv2.setMouseCallback(window, mouse_cb)
 
+        # 画面只随已选点数变化，记录上次绘制时的点数，未变化时不重绘
+        drawn_idx = None
+
         while current_point_idx < 4:
-            disp = image.copy()
+            if drawn_idx != current_point_idx:
+                disp = image.copy()
 
-            # 显示当前需要点击的位置提示
-            text = f"Right-click near {point_names[current_point_idx]} to zoom and select"
-            text_size, _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)
-            cv2.rectangle(disp, (45, 35), (45 + text_size[0] + 10, 55 + text_size[1]), (0, 0, 0), -1)
-            cv2.putText(disp, text, (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+                # 显示当前需要点击的位置提示
+                text = f"Right-click near {point_names[current_point_idx]} to zoom and select"
+                text_size, _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)
+                cv2.rectangle(disp, (45, 35), (45 + text_size[0] + 10, 55 + text_size[1]), (0, 0, 0), -1)
+                cv2.putText(disp, text, (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
 
-            # 显示已选择的点
-            for i, pt in enumerate(points):
-                cv2.circle(disp, pt, 8, (0, 255, 255), -1)
-                cv2.putText(disp, f"{i + 1}", (pt[0] + 10, pt[1] + 10), cv2.FONT_HERSHEY_SIMPLEX,
-                            0.7, (0, 255, 255), 2)
+                # 显示已选择的点
+                for i, pt in enumerate(points):
+                    cv2.circle(disp, pt, 8, (0, 255, 255), -1)
+                    cv2.putText(disp, f"{i + 1}", (pt[0] + 10, pt[1] + 10), cv2.FONT_HERSHEY_SIMPLEX,
+                                0.7, (0, 255, 255), 2)
 
-            cv2.imshow(window, disp)
-            key = cv2.waitKey(1) & 0xFF
+                cv2.imshow(window, disp)
+                drawn_idx = current_point_idx
+
+            key = cv2.waitKey(SELECTION_WAIT_MS) & 0xFF
 
             # ESC键清除所有点重新开始
             if key == 27:
-                points = []
+                points.clear()
                 current_point_idx = 0
+                drawn_idx = None
 
         cv2.destroyWindow(window)
+        cv2.destroyWindow(ZOOM_WINDOW)
 
         # 保存手动选择的四个点供后续标定使用
         self.manual_corners = points.copy()
 
-        # 创建掩码图像
+        # 边界点以int32数组保存一次，后续填充多边形直接使用
+        self.boundary_pts = np.asarray(points, dtype=np.int32).reshape(-1, 2)
+
+        # 创建掩码图像：多边形略微向外扩展（横向5%，纵向15%）
         mask = np.zeros(image.shape[:2], np.uint8)
-        if len(points) == 4:
-            cv2.fillPoly(mask, [np.array(points)], 255)
-
-        # 略微向外扩展多边形（扩展5%）
-        expanded_points = []
-        if len(points) == 4:
-            # 计算中心点
-            center_x = sum(p[0] for p in points) / 4
-            center_y = sum(p[1] for p in points) / 4
-
-            # 向外扩展
-            for p in points:
-                vector_x = p[0] - center_x
-                vector_y = p[1] - center_y
-                expanded_points.append((
-                    int(p[0] + vector_x * 0.05),
-                    int(p[1] + vector_y * 0.15)
-                ))
-
-            # 更新掩码
-            mask = np.zeros(image.shape[:2], np.uint8)
-            cv2.fillPoly(mask, [np.array(expanded_points)], 255)
-
-        # 创建带遮罩的图像
-        masked_img = image.copy()
-        # 将遮罩外区域进行马赛克处理
-        outside_mask = cv2.bitwise_not(mask)
-        # 创建马赛克效果
-        mosaic_img = image.copy()
-        mosaic_block_size = 20
-        h, w = image.shape[:2]
+        if len(self.boundary_pts) == 4:
+            center = self.boundary_pts.mean(axis=0)
+            expanded_pts = self.boundary_pts + (self.boundary_pts - center) * np.array([0.05, 0.15])
+            cv2.fillPoly(mask, [expanded_pts.astype(np.int32)], 255)
+        self.mask = mask
 
-        for i in range(0, h, mosaic_block_size):
-            for j in range(0, w, mosaic_block_size):
-                if i + mosaic_block_size <= h and j + mosaic_block_size <= w:
-                    roi = image[i:i + mosaic_block_size, j:j + mosaic_block_size]
-                    color = roi.mean(axis=(0, 1))
-                    mosaic_img[i:i + mosaic_block_size, j:j + mosaic_block_size] = color
+        # 创建马赛克背景并缓存，后续帧直接复用（遮罩在会话内不变，且仅用于显示）
+        self.session_mosaic = create_mosaic_image(image)
 
-        # 将马赛克应用到遮罩外区域
-        masked_img = cv2.bitwise_and(masked_img, masked_img, mask=mask)
-        mosaic_outside = cv2.bitwise_and(mosaic_img, mosaic_img, mask=outside_mask)
-        final_img = cv2.add(masked_img, mosaic_outside)
+        # 创建带遮罩的图像：场地区域保留原图，遮罩外区域为马赛克
+        final_img = self._compose_display_frame(image, mask)
 
         # 计算初始单应性矩阵用于辅助匹配
         court_corners_2d = np.array([
@@ -355,12 +549,48 @@ class BadmintonCalibrator:
             [4, 472]
         ], dtype=np.float32)
 
-        self.initial_homography = cv2.findHomography(np.array(points), court_corners_2d)[0]
+        self.initial_homography = cv2.findHomography(self.boundary_pts.astype(np.float32), court_corners_2d)[0]
+        # 匹配时只需要逆矩阵（场地坐标投影到图像），在此一次性求逆
+        self.initial_homography_inv = (np.linalg.inv(self.initial_homography)
+                                       if self.initial_homography is not None else None)
 
         return final_img, mask, points
 
-    def capture_and_process_frames(self, video_path, num_frames=30):
-        """从视频中提取连续多帧并处理"""
+    def _apply_court_mask(self, frame, mask):
+        """
+        对帧应用场地掩码
+
+        返回:
+            (masked_frame, display_frame): 仅含场地区域的检测输入帧，以及叠加缓存马赛克背景的显示帧
+        """
+        # copyTo 新分配的目标图先清零，结果与 bitwise_and(frame, frame, mask) 相同，但只读一遍源图
+        masked_frame = cv2.copyTo(frame, mask)
+        return masked_frame, self._compose_display_frame(frame, mask)
+
+    def _compose_display_frame(self, frame, mask, out=None):
+        """
+        将帧的场地区域叠加到缓存的马赛克背景上
+
+        参数:
+            frame: 输入帧
+            mask: 场地掩码
+            out: 可复用的输出缓冲区（仅显示用途时传入以避免逐帧分配）
+        """
+        # 分辨率变化或尚未缓存时重新生成马赛克背景
+        if self.session_mosaic is None or self.session_mosaic.shape != frame.shape:
+            self.session_mosaic = create_mosaic_image(frame)
+
+        if out is None:
+            out = self.session_mosaic.copy()
+        else:
+            np.copyto(out, self.session_mosaic)
+
+        # 单次条件拷贝：遮罩内像素覆盖为原帧，其余保持马赛克
+        cv2.copyTo(frame, mask, out)
+        return out
+
+    def capture_and_process_frames(self, video_path, num_frames=30, batch_size=16):
+        """从视频中提取连续多帧并处理（角点检测按批次进行）"""
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
             print("Error: Could not open video file")
@@ -388,29 +618,16 @@ class BadmintonCalibrator:
         frame_selection_window = "Select Starting Frame"
         cv2.namedWindow(frame_selection_window, cv2.WINDOW_NORMAL)
 
+        # 预览仅用于显示，复用同一个缓冲区；解码帧由缓存提供，避免每次拖动都重新定位解码
+        preview_buffer = np.empty_like(first_frame)
+        last_start_frame = max(0, total_frames - num_frames - 1)
+        preview_cache = PreviewFrameCache(cap, video_path, last_start_frame)
+
         def on_trackbar_change(val):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, val)
-            ret, frame = cap.read()
-            if ret:
+            frame = preview_cache.get(val)
+            if frame is not None:
                 # 应用相同的掩码处理
-                masked_frame = frame.copy()
-                masked_frame = cv2.bitwise_and(masked_frame, masked_frame, mask=mask)
-
-                # 创建马赛克效果
-                mosaic_frame = frame.copy()
-                mosaic_block_size = 20
-                h, w = frame.shape[:2]
-
-                for y in range(0, h, mosaic_block_size):
-                    for x in range(0, w, mosaic_block_size):
-                        if y + mosaic_block_size <= h and x + mosaic_block_size <= w:
-                            roi = frame[y:y + mosaic_block_size, x:x + mosaic_block_size]
-                            color = roi.mean(axis=(0, 1))
-                            mosaic_frame[y:y + mosaic_block_size, x:x + mosaic_block_size] = color
-
-                outside_mask = cv2.bitwise_not(mask)
-                mosaic_outside = cv2.bitwise_and(mosaic_frame, mosaic_frame, mask=outside_mask)
-                final_frame = cv2.add(masked_frame, mosaic_outside)
+                final_frame = self._compose_display_frame(frame, mask, out=preview_buffer)
 
                 # 显示框架编号
                 cv2.putText(final_frame, f"Frame: {val}", (50, 50), cv2.FONT_HERSHEY_SIMPLEX,
@@ -418,8 +635,7 @@ class BadmintonCalibrator:
                 cv2.imshow(frame_selection_window, final_frame)
 
         # 创建轨迹条
-        cv2.createTrackbar("Frame", frame_selection_window, 0, max(0, total_frames - num_frames - 1),
-                           on_trackbar_change)
+        cv2.createTrackbar("Frame", frame_selection_window, 0, last_start_frame, on_trackbar_change)
 
         # 初始显示
         on_trackbar_change(0)
@@ -436,86 +652,136 @@ class BadmintonCalibrator:
 
         cv2.destroyWindow(frame_selection_window)
 
-        # 将视频定位到选择的起始帧
-        cap.set(cv2.CAP_PROP_POS_FRAMES, starting_frame)
+        # 起始帧通常已在预览缓存中，直接复用，视频从其下一帧继续读取
+        start_frame_image = preview_cache.get(starting_frame)
+        preview_cache.close()
+        cached_frames = [start_frame_image] if start_frame_image is not None else []
+        cap.set(cv2.CAP_PROP_POS_FRAMES, starting_frame + len(cached_frames))
 
         processed_frames = []
+        frame_corners = []
         all_detected_corners = []
 
-        # 展示处理进度的窗口
-        progress_window = "Processing Frames"
-        cv2.namedWindow(progress_window, cv2.WINDOW_NORMAL)
+        # 1. 后台线程预读连续帧，主线程应用相同的掩码（马赛克背景使用会话缓存），
+        #    每凑满一个批次即交给检测线程用YOLOv8检测角点（仅输入场地区域），推理与读帧、掩码处理重叠
+        with ThreadPoolExecutor(max_workers=1) as detector:
+            detect_futures = []
+            batch = []
+            for frame in chain(cached_frames, self._iter_prefetched_frames(cap, num_frames - len(cached_frames))):
+                masked_frame, final_frame = self._apply_court_mask(frame, mask)
+                processed_frames.append(final_frame)
+                batch.append(masked_frame)
 
-        for i in range(num_frames):
-            # 读取连续帧
-            ret, frame = cap.read()
-            if not ret:
-                print(f"Warning: Could only read {i} frames of {num_frames} requested")
-                break
+                if len(batch) == batch_size:
+                    detect_futures.append(detector.submit(self.detect_court_corners_batch, batch, batch_size))
+                    batch = []
 
-            # 应用相同的掩码和马赛克处理
-            masked_frame = frame.copy()
-            masked_frame = cv2.bitwise_and(masked_frame, masked_frame, mask=mask)
+            if batch:
+                detect_futures.append(detector.submit(self.detect_court_corners_batch, batch, batch_size))
 
-            # 创建马赛克效果用于遮罩外区域
-            mosaic_frame = frame.copy()
-            mosaic_block_size = 20
-            h, w = frame.shape[:2]
+            for future in detect_futures:
+                frame_corners.extend(future.result())
 
-            for y in range(0, h, mosaic_block_size):
-                for x in range(0, w, mosaic_block_size):
-                    if y + mosaic_block_size <= h and x + mosaic_block_size <= w:
-                        roi = frame[y:y + mosaic_block_size, x:x + mosaic_block_size]
-                        color = roi.mean(axis=(0, 1))
-                        mosaic_frame[y:y + mosaic_block_size, x:x + mosaic_block_size] = color
+        cap.release()
 
-            outside_mask = cv2.bitwise_not(mask)
-            mosaic_outside = cv2.bitwise_and(mosaic_frame, mosaic_frame, mask=outside_mask)
-            final_frame = cv2.add(masked_frame, mosaic_outside)
+        if len(processed_frames) < num_frames:
+            print(f"Warning: Could only read {len(processed_frames)} frames of {num_frames} requested")
 
-            # 使用YOLOv8检测角点
-            corners = self.detect_court_corners_yolov8(final_frame)
+        # 展示处理进度的窗口
+        progress_window = "Processing Frames"
+        cv2.namedWindow(progress_window, cv2.WINDOW_NORMAL)
+
+        # 2. 逐帧显示检测结果（HighGUI需在主线程调用），进度图复用同一个缓冲区
+        #    文字背景框按最长的进度文字计算一次
+        progress_buffer = None
+        progress_backdrop = self._progress_backdrop(f"Processing frame {len(processed_frames)}/{len(processed_frames)}")
+        for i, (final_frame, corners) in enumerate(zip(processed_frames, frame_corners)):
             all_detected_corners.extend(corners)
 
-            # 保存处理后的帧
-            processed_frames.append(final_frame)
-
-            # 显示处理进度并改进文本可见性
-            progress_img = final_frame.copy()
-            # 在图像上显示检测到的角点
-            for pt in corners:
-                cv2.circle(progress_img, pt, 4, (0, 0, 255), -1)  # 将点大小改回4
-
-            # 在文本后添加背景以提高可见性
-            progress_text = f"Processing frame {i + 1}/{num_frames}"
-            text_size, _ = cv2.getTextSize(progress_text, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)
-            cv2.rectangle(progress_img, (45, 35), (45 + text_size[0] + 10, 55 + text_size[1]), (0, 0, 0), -1)
-            cv2.putText(progress_img, progress_text,
-                        (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
-            cv2.imshow(progress_window, progress_img)
+            # 显示处理进度
+            progress_text = f"Processing frame {i + 1}/{len(processed_frames)}"
+            progress_buffer = self._draw_progress_frame(final_frame, corners, progress_text,
+                                                        backdrop=progress_backdrop, out=progress_buffer)
+            cv2.imshow(progress_window, progress_buffer)
             cv2.waitKey(10)  # 短暂显示
 
         cv2.destroyWindow(progress_window)
-        cap.release()
 
         # 使用较大的聚类阈值合并角点
         consolidated_corners = self.consolidate_corner_points(all_detected_corners, threshold=30)  # 聚类阈值改回30
 
         return processed_frames, consolidated_corners, boundary_points
 
+    @staticmethod
+    def _iter_prefetched_frames(cap, num_frames, queue_size=4):
+        """后台线程预读视频帧，按顺序逐帧产出，直到读满 num_frames 或视频结束"""
+        frame_queue = queue.Queue(maxsize=queue_size)
+
+        def reader():
+            for _ in range(num_frames):
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frame_queue.put(frame)
+            frame_queue.put(None)  # 结束标记
+
+        reader_thread = threading.Thread(target=reader, daemon=True)
+        reader_thread.start()
+
+        while True:
+            frame = frame_queue.get()
+            if frame is None:
+                break
+            yield frame
+
+        reader_thread.join()
+
     def detect_court_corners_yolov8(self, image):
         """使用YOLOv8检测场地角点"""
-        results = self.yolo_model(image)
+        return self.detect_court_corners_batch([image])[0]
+
+    def detect_court_corners_batch(self, images, batch_size=16):
+        """
+        使用YOLOv8批量检测多帧中的场地角点
+
+        参数:
+            images: 图像列表
+            batch_size: 每次推理的批大小
+
+        返回:
+            与输入顺序对应的每帧角点列表
+        """
+        frame_corners = []
+
+        for start in range(0, len(images), batch_size):
+            # 先缩小到模型输入尺寸再送入推理，关键点坐标再按比例还原
+            inputs, scales = zip(*(self._resize_for_detection(img) for img in images[start:start + batch_size]))
+            results = self.yolo_model(list(inputs), imgsz=YOLO_IMGSZ, device=self.device, half=self.use_half)
+            for r, scale in zip(results, scales):
+                frame_corners.append(self._extract_keypoint_corners(r, scale))
+
+        return frame_corners
+
+    @staticmethod
+    def _resize_for_detection(image):
+        """将图像长边缩放到 YOLO_IMGSZ，返回 (缩放后图像, 缩放比例)"""
+        scale = YOLO_IMGSZ / max(image.shape[:2])
+        if scale >= 1.0:
+            return image, 1.0
+        return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA), scale
+
+    @staticmethod
+    def _extract_keypoint_corners(result, scale=1.0):
+        """从单帧YOLO结果中提取有效关键点坐标（按缩放比例还原到原图坐标）"""
         corners = []
 
-        for r in results:
-            # 检查是否有关键点结果
-            if hasattr(r, 'keypoints') and r.keypoints is not None:
-                kpts = r.keypoints.xy.cpu().numpy() if hasattr(r.keypoints.xy, "cpu") else r.keypoints.xy
-                for kp_list in kpts:
-                    for kp in kp_list:
-                        if not np.isnan(kp).any():  # 排除无效点
-                            corners.append((int(kp[0]), int(kp[1])))
+        # 检查是否有关键点结果
+        if hasattr(result, 'keypoints') and result.keypoints is not None:
+            kpts = result.keypoints.xy.cpu().numpy() if hasattr(result.keypoints.xy, "cpu") else result.keypoints.xy
+            for kp_list in kpts:
+                for kp in kp_list:
+                    if not np.isnan(kp).any():  # 排除无效点
+                        corners.append((int(kp[0] / scale), int(kp[1] / scale)))
 
         return corners
 
@@ -524,83 +790,68 @@ class BadmintonCalibrator:
         if not corners:
             return []
 
-        clusters = []
-        for point in corners:
-            # 查找点所属的聚类
-            found_cluster = False
-            for cluster in clusters:
-                for cluster_point in cluster:
-                    # 如果点与聚类中的任一点距离小于阈值，将其加入该聚类
-                    if np.linalg.norm(np.array(point) - np.array(cluster_point)) < threshold:
-                        cluster.append(point)
-                        found_cluster = True
-                        break
-                if found_cluster:
-                    break
+        pts = np.asarray(corners, dtype=np.float32)
+        n = len(pts)
 
-            # 如果未找到所属聚类，创建新聚类
-            if not found_cluster:
-                clusters.append([point])
+        # KD树查找距离小于阈值的点对，连通分量即为聚类（单链接：与点的输入顺序无关，
+        # 相邻间距均小于阈值的一串点会合并为同一个角点，即使首尾相距超过阈值）
+        # query_pairs 包含距离等于r的点对，取略小于阈值的r以保持严格小于
+        pairs = cKDTree(pts).query_pairs(r=np.nextafter(threshold, 0), output_type='ndarray')
+        adjacency = coo_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+        num_clusters, labels = connected_components(adjacency, directed=False)
 
         # 对每个聚类计算中心点
-        consolidated_points = []
-        for cluster in clusters:
-            if len(cluster) >= 1:
-                x_mean = int(np.mean([p[0] for p in cluster]))
-                y_mean = int(np.mean([p[1] for p in cluster]))
-                consolidated_points.append((x_mean, y_mean))
-
-        # 将手动选择的四个角点添加到合并后的点集
+        counts = np.bincount(labels, minlength=num_clusters)
+        x_mean = np.bincount(labels, weights=pts[:, 0], minlength=num_clusters) / counts
+        y_mean = np.bincount(labels, weights=pts[:, 1], minlength=num_clusters) / counts
+        centroids = np.stack([x_mean, y_mean], axis=1).astype(int)
+
+        consolidated_points = [(int(x), int(y)) for x, y in centroids]
+
+        # 将手动选择的四个角点添加到合并后的点集（检查是否已经有非常接近的点）
+        # 中心点均为整数，直接比较平方距离，省去开方
+        thr2 = threshold * threshold
         for corner in self.manual_corners:
-            if corner not in consolidated_points:
-                # 检查是否已经有非常接近的点
-                is_close = False
-                for pt in consolidated_points:
-                    if np.linalg.norm(np.array(corner) - np.array(pt)) < threshold:
-                        is_close = True
-                        break
-                if not is_close:
-                    consolidated_points.append(corner)
+            cx, cy = int(corner[0]), int(corner[1])
+            for px, py in consolidated_points:
+                dx = px - cx
+                dy = py - cy
+                if dx * dx + dy * dy < thr2:
+                    break
+            else:
+                consolidated_points.append(corner)
 
         return consolidated_points
 
     def match_corners_to_3d_points(self, corners, boundary_points):
         """使用初始单应性矩阵辅助匹配检测到的角点与3D坐标"""
-        if not corners or self.initial_homography is None:
+        if not corners or self.initial_homography_inv is None:
             return {}
 
         matched = {}
+        max_match_distance = 50  # 设置最大匹配距离
+        max_match_distance_sq = max_match_distance * max_match_distance
 
-        # 使用单应性矩阵将3D点投影到图像平面
-        projected_3d_points = {}
-        for i, (point_3d, label) in enumerate(zip(self.merged_3d_points, self.merged_point_labels)):
-            # 将3D点投影到2D平面 (z=0，所以只需考虑x,y)
-            pt_2d = np.array([point_3d[0], point_3d[1]], dtype=np.float32).reshape(1, 1, 2)
-            projected_pt = cv2.perspectiveTransform(pt_2d, np.linalg.inv(self.initial_homography))
-            projected_pt = (int(projected_pt[0][0][0]), int(projected_pt[0][0][1]))
-            projected_3d_points[i] = (projected_pt, point_3d, label)
-
-        # 为每个检测到的角点找最近的3D点
-        for corner in corners:
-            min_dist = float('inf')
-            best_match = None
-
-            for idx, (projected_pt, point_3d, label) in projected_3d_points.items():
-                dist = np.linalg.norm(np.array(corner) - np.array(projected_pt))
-                if dist < min_dist and dist < 50:  # 设置最大匹配距离
-                    min_dist = dist
-                    best_match = (idx, point_3d, label)
-
-            if best_match:
-                matched[best_match[0]] = (corner, best_match[1], best_match[2])
+        # 使用单应性矩阵将所有3D点一次性投影到图像平面 (z=0，所以只需考虑x,y)
+        projected = cv2.perspectiveTransform(MERGED_COURT_POINTS_2D, self.initial_homography_inv)
+        projected = projected.reshape(-1, 2).astype(int).astype(np.float32)
+
+        # 角点与投影点的平方距离矩阵 [K, M]，为每个检测到的角点找最近的3D点（无需开方）
+        corner_array = np.asarray(corners, dtype=np.float32)
+        diff = corner_array[:, None, :] - projected[None, :, :]
+        sq_distances = np.einsum('kmd,kmd->km', diff, diff)
+        best_indices = sq_distances.argmin(axis=1)
+        best_sq_distances = sq_distances[np.arange(len(corner_array)), best_indices]
+
+        for k in np.flatnonzero(best_sq_distances < max_match_distance_sq):
+            idx = int(best_indices[k])
+            matched[idx] = (corners[k], self.merged_3d_points[idx], self.merged_point_labels[idx])
 
         # 确保手动点击的四个点被匹配
         # 找到对应的3D点索引 (0, 0), (610, 0), (606, 472), (4, 472)
-        manual_point_indices = [0, 1, 2, 3]  # 对应 merged_3d_points 中的索引
-
         for i, corner in enumerate(self.manual_corners):
-            if i < len(manual_point_indices):
-                idx = manual_point_indices[i]
+            if i < len(MANUAL_CORNER_INDICES):
+                idx = MANUAL_CORNER_INDICES[i]
                 point_3d = self.merged_3d_points[idx]
                 label = self.merged_point_labels[idx]
                 matched[idx] = (corner, point_3d, label)
@@ -613,29 +864,32 @@ class BadmintonCalibrator:
             return False
 
         # 提取匹配的2D和3D点
-        points_2d = []
-        points_3d = []
-
-        for idx, (corner, point_3d, _) in matched_corners.items():
-            points_2d.append(corner)
-            points_3d.append(point_3d)
-
-        points_2d = np.array(points_2d, dtype=np.float32)
-        points_3d = np.array(points_3d, dtype=np.float32)
+        matches = list(matched_corners.values())
+        points_2d = np.array([corner for corner, _, _ in matches], dtype=np.float32)
+        points_3d = np.array([point_3d for _, point_3d, _ in matches], dtype=np.float32)
 
         # 至少需要6个点
         if len(points_2d) < 6:
             print("Error: Need at least 6 matched points for reliable calibration")
             return False
 
-        # 计算PnP解
-        success, rotation_vector, translation_vector = cv2.solvePnP(
-            points_3d, points_2d, self.camera_matrix, self.dist_coeffs)
+        # RANSAC剔除错误匹配（SQPnP求初值），再用内点做LM精化
+        success, rotation_vector, translation_vector, inliers = cv2.solvePnPRansac(
+            points_3d, points_2d, self.camera_matrix, self.dist_coeffs,
+            iterationsCount=100, reprojectionError=PNP_REPROJECTION_ERROR, flags=cv2.SOLVEPNP_SQPNP)
 
-        if not success:
+        if not success or inliers is None or len(inliers) < 6:
             print("Error: Failed to solve PnP")
             return False
 
+        inliers = inliers.ravel()
+        if len(inliers) < len(points_2d):
+            print(f"⚠️ PnP RANSAC rejected {len(points_2d) - len(inliers)} of {len(points_2d)} matched points")
+
+        rotation_vector, translation_vector = cv2.solvePnPRefineLM(
+            points_3d[inliers], points_2d[inliers], self.camera_matrix, self.dist_coeffs,
+            rotation_vector, translation_vector)
+
         # 保存外参结果
         self.rotation_vector = rotation_vector
         self.translation_vector = translation_vector
@@ -652,74 +906,21 @@ class BadmintonCalibrator:
         if not hasattr(self, 'rotation_vector') or not hasattr(self, 'translation_vector'):
             return image
 
-        result = image.copy()
-
-        # 定义场地线段对（每对线段定义一条4cm宽的线）
-        court_line_pairs = [
-            # 底线对
-            (([0, 0, 0], [610, 0, 0]), ([4, 4, 0], [606, 4, 0])),
-
-            # 左双打边线
-            (([0, 0, 0], [0, 472, 0]), ([4, 4, 0], [4, 472, 0])),
+        # 在去畸变后的图像上绘制，投影时无需再逐点计算畸变模型
+        result = self.undistort(image)
 
-            # 右双打边线
-            (([610, 0, 0], [610, 472, 0]), ([606, 4, 0], [606, 472, 0])),
+        # 一次性投影所有线段端点，每对线段顺序为 start1, end1, start2, end2
+        num_lines = len(COURT_LINE_ENDPOINTS)
+        projected, _ = cv2.projectPoints(COURT_LINE_ENDPOINTS.reshape(-1, 1, 3), self.rotation_vector,
+                                         self.translation_vector, self.camera_matrix, None)
+        endpoints = projected.reshape(num_lines, 4, 2).astype(np.int32)
 
-            # 左单打边线
-            (([46, 4, 0], [46, 472, 0]), ([50, 4, 0], [50, 472, 0])),
+        # 按 start1 -> end1 -> end2 -> start2 组成填充多边形来表示宽线
+        polygons = list(np.ascontiguousarray(endpoints[:, [0, 1, 3, 2]]).reshape(num_lines, -1, 1, 2))
+        cv2.fillPoly(result, polygons, (0, 255, 0))
 
-            # 右单打边线
-            (([560, 4, 0], [560, 472, 0]), ([564, 4, 0], [564, 472, 0])),
-
-            # 中线
-            (([303, 4, 0], [303, 472, 0]), ([307, 4, 0], [307, 472, 0])),
-
-            # 后发球线
-            (([4, 76, 0], [606, 76, 0]), ([4, 80, 0], [606, 80, 0])),
-
-            # 前发球线
-            (([4, 468, 0], [606, 468, 0]), ([4, 472, 0], [606, 472, 0])),
-
-            # 顶线对
-            (([0, 472, 0], [610, 472, 0]), ([4, 472, 0], [606, 472, 0])),
-        ]
-
-        # 绘制每条线
-        for (start1_3d, end1_3d), (start2_3d, end2_3d) in court_line_pairs:
-            # 投影第一条线的端点
-            start1_3d = np.array([start1_3d], dtype=np.float32).reshape(1, 3)
-            end1_3d = np.array([end1_3d], dtype=np.float32).reshape(1, 3)
-
-            start1_2d, _ = cv2.projectPoints(start1_3d, self.rotation_vector,
-                                             self.translation_vector, self.camera_matrix, self.dist_coeffs)
-            end1_2d, _ = cv2.projectPoints(end1_3d, self.rotation_vector,
-                                           self.translation_vector, self.camera_matrix, self.dist_coeffs)
-
-            # 投影第二条线的端点
-            start2_3d = np.array([start2_3d], dtype=np.float32).reshape(1, 3)
-            end2_3d = np.array([end2_3d], dtype=np.float32).reshape(1, 3)
-
-            start2_2d, _ = cv2.projectPoints(start2_3d, self.rotation_vector,
-                                             self.translation_vector, self.camera_matrix, self.dist_coeffs)
-            end2_2d, _ = cv2.projectPoints(end2_3d, self.rotation_vector,
-                                           self.translation_vector, self.camera_matrix, self.dist_coeffs)
-
-            # 转换为整数坐标
-            start1 = (int(start1_2d[0][0][0]), int(start1_2d[0][0][1]))
-            end1 = (int(end1_2d[0][0][0]), int(end1_2d[0][0][1]))
-            start2 = (int(start2_2d[0][0][0]), int(start2_2d[0][0][1]))
-            end2 = (int(end2_2d[0][0][0]), int(end2_2d[0][0][1]))
-
-            # 创建填充的多边形来表示宽线
-            pts = np.array([start1, end1, end2, start2], np.int32)
-            pts = pts.reshape((-1, 1, 2))
-            cv2.fillPoly(result, [pts], (0, 255, 0))
-
-            # 同时在边缘画线以提高清晰度
-            cv2.line(result, start1, end1, (255, 255, 255), 1)
-            cv2.line(result, start2, end2, (255, 255, 255), 1)
-            cv2.line(result, start1, start2, (255, 255, 255), 1)
-            cv2.line(result, end1, end2, (255, 255, 255), 1)
+        # 同时在边缘画线以提高清晰度（多边形四条边即两条边线及两端连线）
+        cv2.polylines(result, polygons, True, (255, 255, 255), 1)
 
         return result
 
@@ -728,24 +929,25 @@ class BadmintonCalibrator:
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        # 保存最终结果帧
-        cv2.imwrite(os.path.join(output_dir, "calibration_result.jpg"), final_frame)
+        # 保存最终结果帧：JPEG编码与写盘放到后台线程，结果窗口无需等待
+        # （非守护线程，程序退出前会写完；final_frame之后只用于显示，不会被修改）
+        threading.Thread(target=cv2.imwrite,
+                         args=(os.path.join(output_dir, "calibration_result.jpg"), final_frame),
+                         name="calibration-result-writer").start()
 
         # 保存标定参数
         if hasattr(self, 'rotation_vector') and hasattr(self, 'translation_vector'):
-            fs = cv2.FileStorage(os.path.join(output_dir, "extrinsic_parameters.yaml"), cv2.FILE_STORAGE_WRITE)
-            fs.write("camera_matrix", self.camera_matrix)
-            fs.write("distortion_coefficients", self.dist_coeffs)
-            fs.write("rotation_vector", self.rotation_vector)
-            fs.write("translation_vector", self.translation_vector)
-            fs.write("projection_matrix", self.projection_matrix)
-
-            # 保存时间戳
-            fs.write("calibration_date", time.strftime("%Y-%m-%d_%H-%M-%S"))
-            fs.write("image_width", self.image_width)
-            fs.write("image_height", self.image_height)
-
-            fs.release()
+            save_opencv_yaml(os.path.join(output_dir, "extrinsic_parameters.yaml"), {
+                "camera_matrix": self.camera_matrix,
+                "distortion_coefficients": self.dist_coeffs,
+                "rotation_vector": self.rotation_vector,
+                "translation_vector": self.translation_vector,
+                "projection_matrix": self.projection_matrix,
+                # 保存时间戳
+                "calibration_date": time.strftime("%Y-%m-%d_%H-%M-%S"),
+                "image_width": self.image_width,
+                "image_height": self.image_height
+            })
 
             print(f"Calibration results saved to {output_dir}")
             return os.path.join(output_dir, "extrinsic_parameters.yaml")
@@ -789,23 +991,12 @@ class BadmintonCalibrator:
         cv2.namedWindow("Camera Calibration Guide", cv2.WINDOW_NORMAL)
         cv2.resizeWindow("Camera Calibration Guide", 800, 600)
 
-        guide_img = np.zeros((600, 800, 3), dtype=np.uint8)
-        guide_texts = [
-            "Badminton Court Camera Calibration",
-            "",
-            "1. Camera live feed will be shown for selecting court corners",
-            "2. Right-click near each corner to select precise position",
-            "3. Follow order: Bottom Left, Bottom Right, Top Right, Top Left",
-            "4. After corner selection, automatic court point detection will run",
-            "",
-            f"Preview time: {preview_time} seconds",
-            f"Frames for detection: {num_frames}",
-            "",
-            "Press SPACE to continue..."
-        ]
-
-        for i, text in enumerate(guide_texts):
-            cv2.putText(guide_img, text, (50, 80 + i * 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        # 固定说明文字使用缓存的引导图，只绘制依赖运行参数的两行
+        guide_img = render_guide_image(CAMERA_GUIDE_TEXTS, 80).copy()
+        cv2.putText(guide_img, f"Preview time: {preview_time} seconds", (50, 80 + 7 * 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        cv2.putText(guide_img, f"Frames for detection: {num_frames}", (50, 80 + 8 * 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
 
         cv2.imshow("Camera Calibration Guide", guide_img)
         while True:
@@ -873,39 +1064,49 @@ class BadmintonCalibrator:
         cv2.namedWindow(preview_window, cv2.WINDOW_NORMAL)
         
         start_time = time.time()
+        last_show = 0.0
         frame_count = 0
+        frame_id = 0
         last_frame = None
+        overlay_shape = None
         
         while time.time() - start_time < preview_time:
-            # 读取当前帧
-            (ret1, ret2), (frame1, frame2) = camera_manager.read()
+            # 等待摄像头1的新帧（由流读取线程通知），超时则只处理按键
+            frame1, frame_id = camera_manager.wait_for_new_frame(frame_id, timeout=0.1)
             
-            if ret1 and frame1 is not None:
+            if frame1 is not None:
+                # 只保留引用，退出循环后再复制最后一帧
+                last_frame = frame1
+                frame_count += 1
+
+            # 预览刷新限制在约30fps，新帧本身不做节流
+            now = time.monotonic()
+            if frame1 is not None and now - last_show >= PREVIEW_DISPLAY_INTERVAL:
+                last_show = now
+
+                # 固定提示文字只绘制一次，之后每帧按掩码贴上
+                if overlay_shape != frame1.shape:
+                    overlay_shape = frame1.shape
+                    text_roi, static_text, static_mask = self._build_preview_overlay(frame1.shape)
+
                 # 使用第一个摄像头的画面进行标定
                 display_frame = frame1.copy()
+                cv2.copyTo(static_text, static_mask, display_frame[text_roi])
                 
-                # 添加预览信息
+                # 添加预览信息（仅倒计时逐帧绘制）
                 remaining_time = preview_time - (time.time() - start_time)
                 cv2.putText(display_frame, f"Preview: {remaining_time:.1f}s remaining", 
                            (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
-                cv2.putText(display_frame, "Position camera for clear court view", 
-                           (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-                cv2.putText(display_frame, "Press SPACE to use current frame", 
-                           (10, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
                 
                 cv2.imshow(preview_window, display_frame)
-                last_frame = frame1.copy()
-                frame_count += 1
             
-            # 检查用户输入
-            key = cv2.waitKey(1) & 0xFF
+            # 检查用户输入（非阻塞）
+            key = cv2.pollKey() & 0xFF
             if key == ord(' '):  # 空格键提前结束预览
                 break
             elif key == 27:  # ESC键取消
                 cv2.destroyWindow(preview_window)
                 return None
-            
-            time.sleep(0.033)  # 约30fps
         
         cv2.destroyWindow(preview_window)
         
@@ -914,10 +1115,30 @@ class BadmintonCalibrator:
             return None
             
         print(f"✅ Captured {frame_count} preview frames, using latest frame for calibration")
-        return last_frame
+        return last_frame.copy()
 
-    def _capture_and_process_camera_frames(self, camera_manager, mask, num_frames):
-        """从摄像头捕获和处理多帧进行角点检测"""
+    @staticmethod
+    def _build_preview_overlay(frame_shape):
+        """
+        绘制预览画面的固定提示文字
+
+        返回:
+            (roi, text, mask): 文字所在区域的切片、该区域的文字图层和文字像素掩码
+        """
+        canvas = np.zeros(frame_shape, dtype=np.uint8)
+        cv2.putText(canvas, "Position camera for clear court view", 
+                   (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        cv2.putText(canvas, "Press SPACE to use current frame", 
+                   (10, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+
+        # 只保留文字所在的小区域，每帧按掩码贴回该区域
+        mask = ((canvas[:, :, 0] if canvas.ndim == 3 else canvas) > 127).astype(np.uint8)
+        x, y, w, h = cv2.boundingRect(mask)
+        roi = (slice(y, y + h), slice(x, x + w))
+        return roi, canvas[roi].copy(), mask[roi].copy()
+
+    def _capture_and_process_camera_frames(self, camera_manager, mask, num_frames, batch_size=16):
+        """从摄像头捕获多帧，再按批次进行角点检测"""
         print(f"📸 Capturing {num_frames} frames from camera for corner detection...")
         
         processed_frames = []
@@ -927,61 +1148,54 @@ class BadmintonCalibrator:
         progress_window = "Processing Camera Frames"
         cv2.namedWindow(progress_window, cv2.WINDOW_NORMAL)
         
-        for i in range(num_frames):
-            # 读取当前帧
-            (ret1, ret2), (frame1, frame2) = camera_manager.read()
+        # 1. 采集阶段：读取帧并应用掩码（马赛克背景使用会话缓存），仅显示采集进度；
+        #    每凑满一个批次即交给检测线程，推理与后续帧的采集重叠
+        #    进度图只用于显示，两个阶段复用同一个缓冲区；文字背景框按最长的进度文字计算一次
+        progress_buffer = None
+        capture_backdrop = self._progress_backdrop(f"Capturing camera frame {num_frames}/{num_frames}")
+        frame_id = 0
+        with ThreadPoolExecutor(max_workers=1) as detector:
+            detect_futures = []
+            batch = []
+            for i in range(num_frames):
+                # 等待摄像头1的新帧，保证每次处理的都是不同的帧
+                frame1, frame_id = camera_manager.wait_for_new_frame(frame_id, timeout=1.0)
             
-            if not ret1 or frame1 is None:
-                print(f"Warning: Failed to read frame {i+1}, skipping...")
-                continue
+                if frame1 is None:
+                    print(f"Warning: Failed to read frame {i+1}, skipping...")
+                    continue
             
-            # 使用第一个摄像头的画面
-            frame = frame1.copy()
-            
-            # 应用相同的掩码和马赛克处理
-            masked_frame = frame.copy()
-            masked_frame = cv2.bitwise_and(masked_frame, masked_frame, mask=mask)
-
-            # 创建马赛克效果用于遮罩外区域
-            mosaic_frame = frame.copy()
-            mosaic_block_size = 20
-            h, w = frame.shape[:2]
-
-            for y in range(0, h, mosaic_block_size):
-                for x in range(0, w, mosaic_block_size):
-                    if y + mosaic_block_size <= h and x + mosaic_block_size <= w:
-                        roi = frame[y:y + mosaic_block_size, x:x + mosaic_block_size]
-                        color = roi.mean(axis=(0, 1))
-                        mosaic_frame[y:y + mosaic_block_size, x:x + mosaic_block_size] = color
-
-            outside_mask = cv2.bitwise_not(mask)
-            mosaic_outside = cv2.bitwise_and(mosaic_frame, mosaic_frame, mask=outside_mask)
-            final_frame = cv2.add(masked_frame, mosaic_outside)
-
-            # 使用YOLOv8检测角点
-            corners = self.detect_court_corners_yolov8(final_frame)
+                # 使用第一个摄像头的画面（流读取线程每帧解码出新数组，且掩码处理不修改输入，无需复制）
+                masked_frame, final_frame = self._apply_court_mask(frame1, mask)
+                processed_frames.append(final_frame)
+                batch.append(masked_frame)
+
+                if len(batch) == batch_size:
+                    detect_futures.append(detector.submit(self.detect_court_corners_batch, batch, batch_size))
+                    batch = []
+
+                progress_text = f"Capturing camera frame {i + 1}/{num_frames}"
+                progress_buffer = self._draw_progress_frame(final_frame, (), progress_text,
+                                                            backdrop=capture_backdrop, out=progress_buffer)
+                cv2.imshow(progress_window, progress_buffer)
+                cv2.pollKey()  # 刷新窗口，不阻塞采集
+
+            # 2. 检测阶段：提交剩余帧并按顺序收集各批次结果（仅输入场地区域）
+            if batch:
+                detect_futures.append(detector.submit(self.detect_court_corners_batch, batch, batch_size))
+            frame_corners = [corners for future in detect_futures for corners in future.result()]
+
+        # 3. 逐帧显示检测结果
+        processing_backdrop = self._progress_backdrop(
+            f"Processing camera frame {len(processed_frames)}/{len(processed_frames)}")
+        for i, (final_frame, corners) in enumerate(zip(processed_frames, frame_corners)):
             all_detected_corners.extend(corners)
 
-            # 保存处理后的帧
-            processed_frames.append(final_frame)
-
-            # 显示处理进度
-            progress_img = final_frame.copy()
-            # 在图像上显示检测到的角点
-            for pt in corners:
-                cv2.circle(progress_img, pt, 4, (0, 0, 255), -1)
-
-            # 添加进度文本
-            progress_text = f"Processing camera frame {i + 1}/{num_frames}"
-            text_size, _ = cv2.getTextSize(progress_text, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)
-            cv2.rectangle(progress_img, (45, 35), (45 + text_size[0] + 10, 55 + text_size[1]), (0, 0, 0), -1)
-            cv2.putText(progress_img, progress_text,
-                        (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
-            cv2.imshow(progress_window, progress_img)
+            progress_text = f"Processing camera frame {i + 1}/{len(processed_frames)}"
+            progress_buffer = self._draw_progress_frame(final_frame, corners, progress_text,
+                                                        backdrop=processing_backdrop, out=progress_buffer)
+            cv2.imshow(progress_window, progress_buffer)
             cv2.waitKey(10)  # 短暂显示
-            
-            # 添加小延迟以确保帧之间有变化
-            time.sleep(0.1)
 
         cv2.destroyWindow(progress_window)
 
@@ -994,26 +1208,46 @@ class BadmintonCalibrator:
 
         return processed_frames, consolidated_corners
 
+    @staticmethod
+    def _progress_backdrop(longest_text):
+        """按最长的进度文字计算文字背景框的右下角，供整个循环复用"""
+        text_size, _ = cv2.getTextSize(longest_text, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)
+        return 45 + text_size[0] + 10, 55 + text_size[1]
+
+    @staticmethod
+    def _draw_progress_frame(frame, corners, progress_text, backdrop=None, out=None):
+        """
+        在帧副本上绘制检测到的角点和带背景的进度文本
+
+        参数:
+            backdrop: 文字背景框右下角（见 _progress_backdrop），为None时按当前文字计算
+            out: 可选的复用缓冲区，尺寸一致时直接覆盖写入，避免逐帧分配
+        """
+        if out is None or out.shape != frame.shape:
+            progress_img = frame.copy()
+        else:
+            progress_img = out
+            np.copyto(progress_img, frame)
+
+        # 在图像上显示检测到的角点
+        for pt in corners:
+            cv2.circle(progress_img, pt, 4, (0, 0, 255), -1)
+
+        # 在文本后添加背景以提高可见性
+        if backdrop is None:
+            backdrop = BadmintonCalibrator._progress_backdrop(progress_text)
+        cv2.rectangle(progress_img, (45, 35), backdrop, (0, 0, 0), -1)
+        cv2.putText(progress_img, progress_text,
+                    (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+        return progress_img
+
     def calibrate_from_video(self, video_path, output_dir="./calibration_results"):
         """从视频进行外参标定的主函数"""
         # 显示初始指导
         cv2.namedWindow("Calibration Guide", cv2.WINDOW_NORMAL)
         cv2.resizeWindow("Calibration Guide", 800, 600)
 
-        guide_img = np.zeros((600, 800, 3), dtype=np.uint8)
-        guide_texts = [
-            "Badminton Court Calibration",
-            "",
-            "1. First frame will be shown for selecting court corners",
-            "2. Right-click near each corner to select precise position",
-            "3. Follow order: Bottom Left, Bottom Right, Top Right, Top Left",
-            "4. After corner selection, automatic court point detection will run",
-            "",
-            "Press SPACE to continue..."
-        ]
-
-        for i, text in enumerate(guide_texts):
-            cv2.putText(guide_img, text, (50, 100 + i * 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        guide_img = render_guide_image(VIDEO_GUIDE_TEXTS, 100)
 
         cv2.imshow("Calibration Guide", guide_img)
         while True:
@@ -1082,40 +1316,47 @@ def calibrate_cameras_from_live_feed(camera_manager, output_dir, num_frames=20,
         
         # 创建两个独立的单摄像头管理器进行分别标定
         from network_camera import NetworkCameraManager
-        
+
+        camera_manager1 = NetworkCameraManager(camera_manager.camera_url1, None, camera_manager.timestamp_header)
+        camera_manager2 = NetworkCameraManager(camera_manager.camera_url2, None, camera_manager.timestamp_header)
+
+        # 两路流的启动等待与两个标定器的加载互不依赖，并行完成；
+        # 交互式标定依赖HighGUI（非线程安全，且两次标定使用相同窗口名），仍在主线程依次进行
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            executor.submit(camera_manager1.start)
+            executor.submit(camera_manager2.start)
+            calibrator1_future = executor.submit(
+                BadmintonCalibrator, config.camera_params_file_1, config.yolo_court_model)
+            calibrator2_future = executor.submit(
+                BadmintonCalibrator, config.camera_params_file_2, config.yolo_court_model)
+        calibrator1 = calibrator1_future.result()
+        calibrator2 = calibrator2_future.result()
+
+        # 相机1标定期间暂停相机2的解码缓冲
+        camera_manager2.pause()
+
         # 相机1标定
         print("📹 Calibrating Camera 1 from live feed...")
-        camera_manager1 = NetworkCameraManager(camera_manager.camera_url1, None, camera_manager.timestamp_header)
-        camera_manager1.start()
-        time.sleep(2)  # 等待流稳定
-        
-        calibrator1 = BadmintonCalibrator(config.camera_params_file_1, config.yolo_court_model)
         success1 = calibrator1.calibrate_from_camera(camera_manager1, num_frames, preview_time)
-        
+        camera_manager1.stop()
+
         if success1:
             extrinsic_file1 = os.path.join(output_dir, "camera1", "extrinsic_parameters.yaml")
         else:
-            camera_manager1.stop()
+            camera_manager2.stop()
             return None, None
         
-        camera_manager1.stop()
-        
         # 相机2标定
         print("📹 Calibrating Camera 2 from live feed...")
-        camera_manager2 = NetworkCameraManager(camera_manager.camera_url2, None, camera_manager.timestamp_header)
-        camera_manager2.start()
-        time.sleep(2)  # 等待流稳定
-        
-        calibrator2 = BadmintonCalibrator(config.camera_params_file_2, config.yolo_court_model)
+        camera_manager2.pause()  # 恢复缓冲，丢弃暂停前的旧帧
+        camera_manager2.clear_buffer()
         success2 = calibrator2.calibrate_from_camera(camera_manager2, num_frames, preview_time)
+        camera_manager2.stop()
         
         if success2:
             extrinsic_file2 = os.path.join(output_dir, "camera2", "extrinsic_parameters.yaml")
         else:
-            camera_manager2.stop()
             return extrinsic_file1, None
-            
-        camera_manager2.stop()
         
         return extrinsic_file1, extrinsic_file2
         
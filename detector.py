@@ -1,21 +1,41 @@
 import cv2
 import numpy as np
 from ultralytics import YOLO
-from collections import deque
+import os
 import time
 import threading
+from functools import lru_cache
 from utils import config
 
 
+# 批量YOLO推理时每批送入的帧数
+YOLO_BATCH_SIZE = 32
+
+# 右相机匹配点（去畸变后）落在场地边界投影区域外多少像素以内仍视为可能在场内（容纳检测和匹配误差）
+COURT_HULL_MARGIN_PX = 50.0
+
+
+def _to_numpy(values):
+    """将YOLO结果张量（可能位于GPU）转换为numpy数组"""
+    return values.cpu().numpy() if hasattr(values, "cpu") else np.asarray(values)
+
+
 class MultiObjectTracker:
     """多目标跟踪器 - 用于处理多个羽毛球"""
     
     def __init__(self, max_objects=2, distance_threshold=100):
         self.max_objects = max_objects
         self.distance_threshold = distance_threshold
+        self.distance_threshold_sq = distance_threshold ** 2  # 匹配时直接与距离平方比较
         self.tracks = {}  # track_id -> track_info
         self.next_track_id = 0
         self.max_missing_frames = 10
+        self.max_history = 50  # 每条轨迹保留的历史长度
+
+        # 各活跃轨迹最新位置的连续数组（前 _n_tracks 个槽位有效），用于向量化匹配
+        self._track_ids = np.empty(max_objects, dtype=np.int64)
+        self._last_positions = np.empty((max_objects, 2), dtype=np.float64)
+        self._n_tracks = 0
         
         print(f"🎯 Multi-object tracker initialized (max_objects={max_objects})")
     
@@ -43,65 +63,92 @@ class MultiObjectTracker:
         return list(self.tracks.keys())
     
     def _find_best_match(self, pos):
-        """找到最佳匹配的轨迹"""
-        best_track_id = None
-        min_distance = float('inf')
-        
-        for track_id, track in self.tracks.items():
-            if len(track['positions']) > 0:
-                last_pos = track['positions'][-1]
-                distance = np.linalg.norm(np.array(pos) - np.array(last_pos))
-                
-                if distance < self.distance_threshold and distance < min_distance:
-                    min_distance = distance
-                    best_track_id = track_id
-        
-        return best_track_id
-    
+        """找到最佳匹配的轨迹（一次计算到所有轨迹最新位置的距离）"""
+        n = self._n_tracks
+        if n == 0:
+            return None
+
+        diff = self._last_positions[:n] - pos
+        dist_sq = np.einsum('ij,ij->i', diff, diff)
+        best = int(np.argmin(dist_sq))
+
+        if dist_sq[best] < self.distance_threshold_sq:
+            return int(self._track_ids[best])
+        return None
+
+    def _track_slot(self, track_id):
+        """查找轨迹在最新位置数组中的槽位"""
+        return int(np.flatnonzero(self._track_ids[:self._n_tracks] == track_id)[0])
+
     def _create_track(self, pos, conf, timestamp):
         """创建新轨迹"""
         track_id = self.next_track_id
         self.next_track_id += 1
         
+        # 历史记录为预分配的定长环形数组（按字段分开存储），
+        # count为有效条目数，write_idx为下一次写入位置，写满后覆盖最旧的数据
+        positions = np.empty((self.max_history, 2), dtype=np.float64)
+        confidences = np.empty(self.max_history, dtype=np.float64)
+        timestamps = np.empty(self.max_history, dtype=np.float64)
+        positions[0] = pos
+        confidences[0] = conf
+        timestamps[0] = timestamp
+
         self.tracks[track_id] = {
-            'positions': [pos],
-            'confidences': [conf],
-            'timestamps': [timestamp],
+            'positions': positions,
+            'confidences': confidences,
+            'timestamps': timestamps,
+            'count': 1,
+            'write_idx': 1,
             'missing_frames': 0,
             'created_at': timestamp
         }
+
+        slot = self._n_tracks
+        self._track_ids[slot] = track_id
+        self._last_positions[slot] = pos
+        self._n_tracks += 1
         
         print(f"🆕 Created new track {track_id} at position {pos}")
     
     def _update_track(self, track_id, pos, conf, timestamp):
         """更新轨迹"""
         track = self.tracks[track_id]
-        track['positions'].append(pos)
-        track['confidences'].append(conf)
-        track['timestamps'].append(timestamp)
+        max_history = self.max_history
+        idx = track['write_idx']
+        track['positions'][idx] = pos
+        track['confidences'][idx] = conf
+        track['timestamps'][idx] = timestamp
+        track['write_idx'] = (idx + 1) % max_history
+        track['count'] = min(track['count'] + 1, max_history)
         track['missing_frames'] = 0
-        
-        # 限制轨迹长度
-        max_history = 50
-        if len(track['positions']) > max_history:
-            track['positions'] = track['positions'][-max_history:]
-            track['confidences'] = track['confidences'][-max_history:]
-            track['timestamps'] = track['timestamps'][-max_history:]
+        self._last_positions[self._track_slot(track_id)] = pos
     
     def _remove_lost_tracks(self):
         """移除丢失的轨迹"""
-        to_remove = []
-        for track_id, track in self.tracks.items():
-            if track['missing_frames'] > self.max_missing_frames:
-                to_remove.append(track_id)
+        max_missing_frames = self.max_missing_frames
+        to_remove = [track_id for track_id, track in self.tracks.items()
+                     if track['missing_frames'] > max_missing_frames]
         
         for track_id in to_remove:
             print(f"🗑️ Removing lost track {track_id}")
             del self.tracks[track_id]
+
+            # 用最后一个槽位填补被移除的槽位，保持有效数据连续
+            slot = self._track_slot(track_id)
+            last = self._n_tracks - 1
+            self._track_ids[slot] = self._track_ids[last]
+            self._last_positions[slot] = self._last_positions[last]
+            self._n_tracks = last
     
     def get_tracks(self):
         """获取所有活跃轨迹"""
         return self.tracks
+
+    @staticmethod
+    def last_timestamp(track):
+        """轨迹最近一次更新的时间戳（write_idx为0时-1索引正好指向环形数组末尾）"""
+        return track['timestamps'][track['write_idx'] - 1]
     
     def get_best_track(self):
         """获取最佳轨迹（最长且最近活跃）"""
@@ -113,9 +160,9 @@ class MultiObjectTracker:
         
         for track_id, track in self.tracks.items():
             # 评分标准：轨迹长度 + 最近活跃程度 + 平均置信度
-            length_score = len(track['positions'])
+            length_score = track['count']
             recency_score = max(0, 10 - track['missing_frames'])
-            confidence_score = np.mean(track['confidences']) if track['confidences'] else 0
+            confidence_score = track['confidences'][:length_score].mean()
             
             total_score = length_score + recency_score + confidence_score * 10
             
@@ -148,9 +195,9 @@ class TrajectoryQualityEvaluator:
         if len(points_3d) < 3:
             return 0.0
 
-        # 转换为numpy数组
-        points = np.array(points_3d)
-        times = np.array(timestamps)
+        # 转换为numpy数组（已是数组时直接使用，不再复制）
+        points = np.asarray(points_3d)
+        times = np.asarray(timestamps)
 
         # 计算各项得分
         physics_score = self._evaluate_physics(points, times)
@@ -173,57 +220,44 @@ class TrajectoryQualityEvaluator:
         if len(points) < 3:
             return 0.0
 
-        try:
-            # 计算速度
-            velocities = []
-            for i in range(1, len(points)):
-                dt = times[i] - times[i - 1]
-                if dt > 0:
-                    vel = (points[i] - points[i - 1]) / dt
-                    velocities.append(vel)
-
-            if len(velocities) < 2:
-                return 0.0
-
-            velocities = np.array(velocities)
-
-            # 1. 检查Z方向是否有下降趋势
-            z_velocities = velocities[:, 2]
-            has_downward_trend = np.mean(z_velocities) < -50  # 平均向下速度 > 50 cm/s
-
-            # 2. 检查速度变化的平滑性
-            speed_changes = []
-            for i in range(1, len(velocities)):
-                speed_change = np.linalg.norm(velocities[i] - velocities[i - 1])
-                speed_changes.append(speed_change)
-
-            avg_speed_change = np.mean(speed_changes) if speed_changes else 0
-            smooth_score = max(0, 1 - avg_speed_change / self.max_speed_change)
-
-            # 3. 检查轨迹形状是否接近抛物线
-            # 简化检查：Z坐标随时间的二次拟合
-            try:
-                z_coords = points[:, 2]
-                time_relative = times - times[0]
-                poly_coeffs = np.polyfit(time_relative, z_coords, 2)
-                poly_fit = np.polyval(poly_coeffs, time_relative)
-                fit_error = np.mean(np.abs(z_coords - poly_fit))
-                parabola_score = max(0, 1 - fit_error / 100)  # 误差小于10cm得满分
-            except:
-                parabola_score = 0.5
-
-            # 综合物理得分
-            physics_score = (
-                    (1.0 if has_downward_trend else 0.3) * 0.4 +
-                    smooth_score * 0.3 +
-                    parabola_score * 0.3
-            )
-
-            return min(1.0, physics_score)
+        # 计算速度（跳过时间间隔非正的相邻点对）
+        dt = np.diff(times)
+        valid = dt > 0
+        velocities = np.diff(points, axis=0)[valid] / dt[valid, None]
 
-        except Exception as e:
+        if len(velocities) < 2:
             return 0.0
 
+        # 1. 检查Z方向是否有下降趋势
+        has_downward_trend = np.mean(velocities[:, 2]) < -50  # 平均向下速度 > 50 cm/s
+
+        # 2. 检查速度变化的平滑性
+        velocity_changes = np.diff(velocities, axis=0)
+        speed_changes = np.sqrt(np.einsum('ij,ij->i', velocity_changes, velocity_changes))
+        avg_speed_change = np.mean(speed_changes)
+        smooth_score = max(0, 1 - avg_speed_change / self.max_speed_change)
+
+        # 3. 检查轨迹形状是否接近抛物线
+        # 简化检查：Z坐标随时间的二次拟合
+        try:
+            z_coords = points[:, 2]
+            time_relative = times - times[0]
+            poly_coeffs = np.polyfit(time_relative, z_coords, 2)
+            poly_fit = np.polyval(poly_coeffs, time_relative)
+            fit_error = np.mean(np.abs(z_coords - poly_fit))
+            parabola_score = max(0, 1 - fit_error / 100)  # 误差小于10cm得满分
+        except:
+            parabola_score = 0.5
+
+        # 综合物理得分
+        physics_score = (
+                (1.0 if has_downward_trend else 0.3) * 0.4 +
+                smooth_score * 0.3 +
+                parabola_score * 0.3
+        )
+
+        return min(1.0, physics_score)
+
     def _evaluate_continuity(self, points, times):
         """评估连续性"""
         if len(points) < 2:
@@ -238,12 +272,9 @@ class TrajectoryQualityEvaluator:
         time_consistency = max(0, 1 - interval_std / expected_interval)
 
         # 空间距离的合理性
-        distances = []
-        for i in range(1, len(points)):
-            dist = np.linalg.norm(points[i] - points[i - 1])
-            distances.append(dist)
-
-        avg_distance = np.mean(distances) if distances else 0
+        steps = np.diff(points, axis=0)
+        distances = np.sqrt(np.einsum('ij,ij->i', steps, steps))
+        avg_distance = distances.mean()
         # 合理的帧间距离应该在1-50cm之间
         distance_score = 1.0 if 1 <= avg_distance <= 50 else max(0, 1 - abs(avg_distance - 25) / 100)
 
@@ -261,11 +292,11 @@ class TrajectoryQualityEvaluator:
 
         # 检查是否包含足够的下降段
         z_coords = points[:, 2]
-        z_range = np.max(z_coords) - np.min(z_coords)
+        min_height = z_coords.min()
+        z_range = z_coords.max() - min_height
         height_score = min(1.0, z_range / 100)  # 1米高度差得满分
 
         # 检查是否接近地面
-        min_height = np.min(z_coords)
         ground_proximity = max(0, 1 - min_height / 200)  # 2米以下开始得分
 
         # 时间跨度
@@ -308,10 +339,13 @@ class TrajectorySegmentManager:
         if len(points_3d) < self.min_segment_length:
             return None, None, 0.0
 
-        best_segment = None
-        best_timestamps = None
+        best_range = None
         best_score = 0.0
 
+        # 整段只转换一次数组，各窗口直接取切片视图评估
+        points = np.asarray(points_3d, dtype=np.float64)
+        times = np.asarray(timestamps, dtype=np.float64)
+
         # 滑动窗口评估不同片段
         segment_length = max(self.min_segment_length, len(points_3d) // 3)
         step_size = max(1, int(segment_length * (1 - self.segment_overlap)))
@@ -319,19 +353,19 @@ class TrajectorySegmentManager:
         for start_idx in range(0, len(points_3d) - self.min_segment_length + 1, step_size):
             end_idx = min(start_idx + segment_length, len(points_3d))
 
-            segment_points = points_3d[start_idx:end_idx]
-            segment_times = timestamps[start_idx:end_idx]
-
             score = self.quality_evaluator.evaluate_trajectory_segment(
-                segment_points, segment_times, current_time
+                points[start_idx:end_idx], times[start_idx:end_idx], current_time
             )
 
             if score > best_score:
                 best_score = score
-                best_segment = segment_points
-                best_timestamps = segment_times
+                best_range = (start_idx, end_idx)
+
+        if best_range is None:
+            return None, None, best_score
 
-        return best_segment, best_timestamps, best_score
+        start_idx, end_idx = best_range
+        return points_3d[start_idx:end_idx], timestamps[start_idx:end_idx], best_score
 
 
 class BufferedImageProcessor:
@@ -343,10 +377,14 @@ class BufferedImageProcessor:
         self.fps = fps
         self.max_buffer_size = int(buffer_duration * fps)
 
-        # 图像缓冲区
-        self.image_buffer1 = deque(maxlen=self.max_buffer_size)
-        self.image_buffer2 = deque(maxlen=self.max_buffer_size)
-        self.timestamp_buffer = deque(maxlen=self.max_buffer_size)
+        # 图像缓冲区：预分配的环形数组，首帧到达时按帧尺寸分配，之后逐帧原地拷贝
+        self.frame_ring1 = None
+        self.frame_ring2 = None
+        self.frame_valid1 = np.zeros(self.max_buffer_size, dtype=bool)  # 对应槽位是否有帧（相机可能丢帧）
+        self.frame_valid2 = np.zeros(self.max_buffer_size, dtype=bool)
+        self.timestamp_ring = np.empty(self.max_buffer_size, dtype=np.float64)
+        self.write_idx = 0
+        self.buffer_count = 0
         # Enhanced state management
         self.processing_lock = threading.Lock()  # Add thread safety
         self.last_processing_time = 0
@@ -362,12 +400,47 @@ class BufferedImageProcessor:
     def add_frame_pair(self, frame1, frame2, timestamp):
         """添加帧对到缓冲区"""
         if not self.is_processing:  # 只在非处理状态下缓冲
-            self.image_buffer1.append(frame1.copy() if frame1 is not None else None)
-            self.image_buffer2.append(frame2.copy() if frame2 is not None else None)
-            self.timestamp_buffer.append(timestamp)
+            idx = self.write_idx
+            self.frame_ring1 = self._write_frame(self.frame_ring1, self.frame_valid1, idx, frame1)
+            self.frame_ring2 = self._write_frame(self.frame_ring2, self.frame_valid2, idx, frame2)
+            self.timestamp_ring[idx] = timestamp
+
+            self.write_idx = (idx + 1) % self.max_buffer_size
+            self.buffer_count = min(self.buffer_count + 1, self.max_buffer_size)
+
+    def _write_frame(self, ring, valid, idx, frame):
+        """将帧拷贝到环形数组的指定槽位，帧尺寸变化时重新分配（旧帧作废）"""
+        if frame is None:
+            valid[idx] = False
+            return ring
+
+        if ring is None or ring.shape[1:] != frame.shape or ring.dtype != frame.dtype:
+            ring = np.empty((self.max_buffer_size,) + frame.shape, dtype=frame.dtype)
+            valid[:] = False
+
+        np.copyto(ring[idx], frame)
+        valid[idx] = True
+        return ring
+
+    def _buffered_order(self):
+        """按时间先后返回缓冲区中有效槽位的索引"""
+        start = (self.write_idx - self.buffer_count) % self.max_buffer_size
+        return (start + np.arange(self.buffer_count)) % self.max_buffer_size
+
+    def _reset_buffer(self):
+        """清空环形缓冲区（保留已分配的数组以便复用）"""
+        self.frame_valid1[:] = False
+        self.frame_valid2[:] = False
+        self.write_idx = 0
+        self.buffer_count = 0
 
     def trigger_processing(self, callback=None):
-        """Thread-safe processing trigger with cooldown"""
+        """Thread-safe processing trigger with cooldown
+
+        callback(detections1, detections2, timestamps, frames1, frames2): frames are views
+        into the ring buffer (None for missing frames), timestamps is a float64 ndarray.
+        The views are only valid until buffering resumes, so copy any frame kept after the callback returns.
+        """
         current_time = time.time()
 
         with self.processing_lock:
@@ -381,7 +454,7 @@ class BufferedImageProcessor:
                 print(f"⏱️ Processing cooldown: {remaining:.1f}s remaining")
                 return False
 
-            if len(self.image_buffer1) < 10:
+            if self.buffer_count < 10:
                 print("❌ Insufficient buffered frames for processing")
                 return False
 
@@ -401,32 +474,21 @@ class BufferedImageProcessor:
     def _process_buffered_frames(self):
         """处理缓冲的帧"""
         try:
-            print(f"Processing {len(self.image_buffer1)} buffered frames...")
-
-            # 复制缓冲区数据以避免处理期间的修改
-            frames1 = list(self.image_buffer1)
-            frames2 = list(self.image_buffer2)
-            timestamps = list(self.timestamp_buffer)
-
-            # 批量YOLO检测
-            all_detections1 = []
-            all_detections2 = []
-
-            # 处理相机1
-            for frame in frames1:
-                if frame is not None:
-                    detections = self._detect_shuttlecock_in_frame(frame)
-                else:
-                    detections = []
-                all_detections1.append(detections)
-
-            # 处理相机2
-            for frame in frames2:
-                if frame is not None:
-                    detections = self._detect_shuttlecock_in_frame(frame)
-                else:
-                    detections = []
-                all_detections2.append(detections)
+            print(f"Processing {self.buffer_count} buffered frames...")
+
+            # 处理期间不再写入缓冲区，直接取环形数组中各槽位的视图，无需拷贝帧
+            order = self._buffered_order()
+            frames1 = [self.frame_ring1[k] if self.frame_valid1[k] else None for k in order]
+            frames2 = [self.frame_ring2[k] if self.frame_valid2[k] else None for k in order]
+            timestamps = self.timestamp_ring[order]  # 按时间顺序取出的时间戳数组（一次拷贝，不逐个装箱为Python对象）
+
+            # 批量YOLO检测：两路相机的帧合并后分批推理，再按帧数拆回各相机
+            all_detections = self._detect_shuttlecocks_batch(frames1 + frames2)
+            all_detections1 = all_detections[:len(frames1)]
+            all_detections2 = all_detections[len(frames1):]
+
+            self._report_multiple_detections("Camera 1", all_detections1)
+            self._report_multiple_detections("Camera 2", all_detections2)
 
             # 回调处理结果
             if self.processing_callback:
@@ -459,69 +521,77 @@ class BufferedImageProcessor:
         """Enhanced buffer clearing with state reset"""
         with self.processing_lock:
             if not self.is_processing:
-                self.image_buffer1.clear()
-                self.image_buffer2.clear()
-                self.timestamp_buffer.clear()
+                self._reset_buffer()
                 print("✅ Image buffer cleared")
             else:
                 print("⚠️ Cannot clear buffer while processing")
 
-    def _detect_shuttlecock_in_frame(self, frame):
-        """在单帧中检测羽毛球 - 支持多个羽毛球"""
-        if frame is None:
-            return []
+    def _detect_shuttlecocks_batch(self, frames):
+        """批量检测多帧中的羽毛球，返回与输入帧一一对应的检测列表（空帧对应空列表）"""
+        all_detections = [[] for _ in frames]
+        valid_indices = [i for i, frame in enumerate(frames) if frame is not None]
+
+        for start in range(0, len(valid_indices), YOLO_BATCH_SIZE):
+            batch_indices = valid_indices[start:start + YOLO_BATCH_SIZE]
+            results = self.model([frames[i] for i in batch_indices], conf=0.3, verbose=False)
+
+            # 每帧对应一个结果
+            for i, r in zip(batch_indices, results):
+                detections = self._parse_yolo_result(r)
+                if len(detections) > 1:
+                    detections.sort(key=lambda x: x[1], reverse=True)  # 按置信度降序排序
+                all_detections[i] = detections
 
-        results = self.model(frame, conf=0.3, verbose=False)
+        return all_detections
+
+    @staticmethod
+    def _parse_yolo_result(r):
+        """解析单个YOLO结果为 [(中心点, 置信度), ...]
+
+        筛选在结果张量所在设备上完成，只把保留下来的少量行拷回主机
+        """
         detections = []
 
-        for r in results:
-            # 处理关键点结果
-            if hasattr(r, 'keypoints') and r.keypoints is not None:
-                kpts = r.keypoints.xy.cpu().numpy() if hasattr(r.keypoints.xy, "cpu") else r.keypoints.xy
-                for kp_list in kpts:
-                    for kp in kp_list:
-                        if not np.isnan(kp).any():
-                            pos = (int(kp[0]), int(kp[1]))
-                            detections.append((pos, 1.0))
-
-            # 处理边界框结果
-            if hasattr(r, 'boxes') and len(r.boxes) > 0:
-                boxes = r.boxes.xyxy.cpu().numpy() if hasattr(r.boxes.xyxy, "cpu") else r.boxes.xyxy
-                classes = r.boxes.cls.cpu().numpy() if hasattr(r.boxes.cls, "cpu") else r.boxes.cls
-                confidences = r.boxes.conf.cpu().numpy() if hasattr(r.boxes.conf, "cpu") else r.boxes.conf
-
-                shuttlecock_indices = np.where(classes == 0)[0]
-                for idx in shuttlecock_indices:
-                    box = boxes[idx]
-                    conf = confidences[idx]
-                    x1, y1, x2, y2 = map(int, box)
-                    center = ((x1 + x2) // 2, (y1 + y2) // 2)
-                    detections.append((center, conf))
-
-        # 如果检测到多个羽毛球，按置信度排序并标记
-        if len(detections) > 1:
-            detections.sort(key=lambda x: x[1], reverse=True)  # 按置信度降序排序
-            print(f"🏸 Multiple shuttlecocks detected: {len(detections)} objects")
-            for i, (pos, conf) in enumerate(detections):
-                print(f"   Shuttlecock {i+1}: position {pos}, confidence {conf:.3f}")
+        # 处理关键点结果（NaN != NaN，借此在设备上剔除无效关键点）
+        if hasattr(r, 'keypoints') and r.keypoints is not None:
+            kpts = r.keypoints.xy
+            valid_kpts = _to_numpy(kpts[(kpts == kpts).all(-1)]).astype(np.int64)
+            detections.extend((pos, 1.0) for pos in map(tuple, valid_kpts.tolist()))
+
+        # 处理边界框结果
+        if hasattr(r, 'boxes') and len(r.boxes) > 0:
+            shuttlecock_mask = r.boxes.cls == 0
+            boxes = _to_numpy(r.boxes.xyxy[shuttlecock_mask])
+            confidences = _to_numpy(r.boxes.conf[shuttlecock_mask])
+
+            # 一次向量运算得到全部中心点（先截断为整数再取中点，与逐框int()一致）
+            corners = boxes.astype(np.int64)
+            centers = (corners[:, :2] + corners[:, 2:]) // 2
+            detections.extend(zip(map(tuple, centers.tolist()), confidences))
 
         return detections
 
+    @staticmethod
+    def _report_multiple_detections(camera_name, detections_list):
+        """汇总输出多羽毛球检测情况，避免逐帧刷屏"""
+        multi_counts = [len(d) for d in detections_list if len(d) > 1]
+        if multi_counts:
+            print(f"🏸 {camera_name}: multiple shuttlecocks in {len(multi_counts)} frames "
+                  f"(up to {max(multi_counts)} objects)")
+
     def get_buffer_info(self):
         """获取缓冲区信息"""
         return {
-            'buffer_size': len(self.image_buffer1),
+            'buffer_size': self.buffer_count,
             'max_size': self.max_buffer_size,
             'is_processing': self.is_processing,
-            'buffer_time_span': len(self.timestamp_buffer) / self.fps if self.timestamp_buffer else 0
+            'buffer_time_span': self.buffer_count / self.fps
         }
 
     def clear_buffer(self):
         """清空缓冲区"""
         if not self.is_processing:
-            self.image_buffer1.clear()
-            self.image_buffer2.clear()
-            self.timestamp_buffer.clear()
+            self._reset_buffer()
             print("Image buffer cleared")
 
 
@@ -532,6 +602,7 @@ class StereoProcessor:
         self.camera1_params = None
         self.camera2_params = None
         self.fundamental_matrix = None
+        self.right_court_halfplanes = None  # 场地边界在右相机图像中投影凸包的边半平面 (单位外法向 [K,2], 偏移 [K])
 
         # 轨迹管理
         self.trajectory_manager = TrajectorySegmentManager()
@@ -558,23 +629,30 @@ class StereoProcessor:
         self.rejected_points = []  # 被边界过滤排除的点
         self.low_quality_points = []  # 质量评估低的点
         self.triangulation_failed_points = []  # 三角测量失败的点对
+        self.pruned_points = []  # 右图点位于场地投影区域外、跳过三角测量的点对
 
         print("StereoProcessor initialized with debug tracking and multi-object support enabled")
 
     def load_camera_parameters(self, camera1_file, camera2_file):
         """加载相机参数"""
         try:
-            self.camera1_params = self._load_camera_params(camera1_file)
-            self.camera2_params = self._load_camera_params(camera2_file)
+            self.camera1_params = self._load_camera_params(camera1_file, os.path.getmtime(camera1_file))
+            self.camera2_params = self._load_camera_params(camera2_file, os.path.getmtime(camera2_file))
             self._compute_fundamental_matrix()
+            self._compute_right_court_hull()
             print("Stereo camera parameters loaded successfully")
             return True
         except Exception as e:
             print(f"Error loading stereo parameters: {e}")
             return False
 
-    def _load_camera_params(self, params_file):
-        """从文件加载相机参数"""
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _load_camera_params(params_file, mtime):
+        """从文件加载相机参数
+
+        按 (路径, 修改时间) 缓存，文件未变化时重复加载直接复用结果；返回的字典及其中数组均视为只读
+        """
         fs = cv2.FileStorage(params_file, cv2.FILE_STORAGE_READ)
 
         camera_matrix = fs.getNode("camera_matrix").mat()
@@ -587,13 +665,16 @@ class StereoProcessor:
         rotation_matrix, _ = cv2.Rodrigues(rotation_vector)
         camera_position = -np.dot(rotation_matrix.T, translation_vector)
 
+        # 派生量在加载时算好，供基础矩阵和每批三角测量直接复用
         return {
             'camera_matrix': camera_matrix,
+            'camera_matrix_inv': np.linalg.inv(camera_matrix),
             'dist_coeffs': dist_coeffs,
             'rotation_vector': rotation_vector,
             'translation_vector': translation_vector,
             'rotation_matrix': rotation_matrix,
-            'camera_position': camera_position
+            'camera_position': camera_position,
+            'camera_center': camera_position.flatten()
         }
 
     def _compute_fundamental_matrix(self):
@@ -615,9 +696,9 @@ class StereoProcessor:
                            [-t_rel[1, 0], t_rel[0, 0], 0]])
 
             E = tx @ R_rel
-            K1 = self.camera1_params['camera_matrix']
-            K2 = self.camera2_params['camera_matrix']
-            self.fundamental_matrix = np.linalg.inv(K2).T @ E @ np.linalg.inv(K1)
+            K1_inv = self.camera1_params['camera_matrix_inv']
+            K2_inv = self.camera2_params['camera_matrix_inv']
+            self.fundamental_matrix = K2_inv.T @ E @ K1_inv
 
             print("Fundamental matrix computed successfully")
 
@@ -625,6 +706,69 @@ class StereoProcessor:
             print(f"Error computing fundamental matrix: {e}")
             self.fundamental_matrix = None
 
+    def _compute_right_court_hull(self):
+        """将场地边界框的8个角点投影到右相机（无畸变）图像，取凸包并转换为各边的半平面，用于在三角测量前剔除场外匹配
+
+        针孔投影保持凸性，边界框内的点必然投影在凸包内；畸变在匹配点一侧通过去畸变消除
+        """
+        self.right_court_halfplanes = None
+        if self.camera2_params is None:
+            return
+
+        bounds = self.court_bounds
+        corners = np.array([[x, y, z]
+                            for x in (bounds['x_min'], bounds['x_max'])
+                            for y in (bounds['y_min'], bounds['y_max'])
+                            for z in (bounds['z_min'], bounds['z_max'])], dtype=np.float64)
+
+        # 有角点位于相机后方时投影不再保持凸性，此时不做提前剔除
+        R = self.camera2_params['rotation_matrix']
+        t = self.camera2_params['translation_vector']
+        if np.any((corners @ R.T + t.reshape(1, 3))[:, 2] <= 0):
+            return
+
+        image_corners, _ = cv2.projectPoints(
+            corners,
+            self.camera2_params['rotation_vector'],
+            t,
+            self.camera2_params['camera_matrix'],
+            None
+        )
+        hull = cv2.convexHull(image_corners.astype(np.float32)).reshape(-1, 2).astype(np.float64)
+        if len(hull) < 3:
+            return
+
+        # 每条边的单位法向，统一翻转为指向凸包外侧
+        edges = np.roll(hull, -1, axis=0) - hull
+        normals = np.stack([edges[:, 1], -edges[:, 0]], axis=1)
+        normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+        offsets = np.einsum('ij,ij->i', normals, hull)
+        inward = normals @ hull.mean(axis=0) - offsets > 0
+        normals[inward] *= -1
+        offsets[inward] *= -1
+
+        self.right_court_halfplanes = (normals, offsets)
+
+    def _outside_right_court_hull(self, right_points):
+        """判断右相机中的匹配点是否明显位于场地投影区域之外（视线不经过场地边界框），返回布尔掩码
+
+        整批点一次去畸变到像素坐标，再对凸包各边半平面做一次向量比较：超出任一条边所在直线
+        COURT_HULL_MARGIN_PX 以上才判为场外（角点附近比到凸包的欧氏距离更保守）；凸包不可用时全部返回False
+        """
+        outside = np.zeros(len(right_points), dtype=bool)
+        if self.right_court_halfplanes is None or not right_points:
+            return outside
+
+        undistorted = cv2.undistortPoints(
+            np.asarray(right_points, dtype=np.float32).reshape(-1, 1, 2),
+            self.camera2_params['camera_matrix'],
+            self.camera2_params['dist_coeffs'],
+            P=self.camera2_params['camera_matrix']
+        ).reshape(-1, 2).astype(np.float64)
+
+        normals, offsets = self.right_court_halfplanes
+        return np.max(undistorted @ normals.T - offsets, axis=1) > COURT_HULL_MARGIN_PX
+
     def process_batch_detections(self, detections_list1, detections_list2, timestamps):
         """批量处理检测结果 - 增强调试追踪和多目标支持"""
         if len(detections_list1) != len(detections_list2) != len(timestamps):
@@ -634,65 +778,92 @@ class StereoProcessor:
         all_3d_points = []
         all_timestamps_3d = []
 
-        # 清空调试数据
-        self.rejected_points = []
+        # 清空调试数据（被排除点和三角测量失败点在下方整批重建）
         self.low_quality_points = []
-        self.triangulation_failed_points = []
 
         print(f"Processing {len(detections_list1)} frame pairs with multi-object tracking...")
 
-        # 处理每一帧的检测结果
-        for i, (det1, det2, timestamp) in enumerate(zip(detections_list1, detections_list2, timestamps)):
-            # 双目匹配
-            matched_pairs = self._match_stereo_points(det1, det2)
+        # 同时跟踪多个羽毛球的帧数（处理结束后汇总输出，避免逐帧刷屏）
+        multi_track_frames = 0
+        max_active_tracks = 0
 
-            # 当前帧的所有3D检测点
-            frame_3d_points = []
-            
-            # 三角测量
-            for left_point, right_point, match_distance, match_conf in matched_pairs:
-                point_3d = self._triangulate_point(left_point, right_point)
-
-                if point_3d is None:
-                    # 记录三角测量失败的点对
-                    self.triangulation_failed_points.append({
-                        'left_point': left_point,
-                        'right_point': right_point,
-                        'timestamp': timestamp,
-                        'frame_index': i,
-                        'reason': 'triangulation_failed'
-                    })
-                    continue
-
-                if self._is_point_in_bounds(point_3d):
-                    frame_3d_points.append((point_3d, match_conf))
-                    all_3d_points.append(point_3d)
-                    all_timestamps_3d.append(timestamp)
-                else:
-                    # 记录被边界过滤排除的点
-                    self.rejected_points.append({
-                        'point_3d': point_3d,
-                        'timestamp': timestamp,
-                        'frame_index': i,
-                        'reason': 'out_of_bounds',
-                        'match_confidence': match_conf,
-                        'match_distance': match_distance
-                    })
-            
-            # 更新多目标跟踪器
-            if frame_3d_points:
-                # 将3D点投影到2D用于跟踪（使用相机1的投影）
-                tracking_detections = []
-                for point_3d, conf in frame_3d_points:
-                    # 简化投影：使用XY坐标作为2D位置
-                    pos_2d = (int(point_3d[0] + 500), int(point_3d[1] + 500))  # 偏移到正值
-                    tracking_detections.append((pos_2d, conf))
-                
-                # 更新跟踪器
-                active_tracks = self.multi_tracker.update(tracking_detections, timestamp)
-                
-                if len(active_tracks) > 1:
-                    print(f"📍 Frame {i}: Tracking {len(active_tracks)} shuttlecocks")
+        # 逐帧双目匹配，收集整批匹配点对及其所属帧
+        pairs = []
+        for i, (det1, det2, timestamp) in enumerate(zip(detections_list1, detections_list2, timestamps)):
+            for left_point, right_point, match_distance, match_conf in self._match_stereo_points(det1, det2):
+                pairs.append((i, timestamp, left_point, right_point, match_distance, match_conf))
+
+        # 右图点超出场地投影区域容差的点对视为不可能落在场内，直接跳过三角测量（配对结果不受影响）
+        outside_court = self._outside_right_court_hull([pair[3] for pair in pairs])
+        self.pruned_points = [
+            {
+                'left_point': pairs[k][2],
+                'right_point': pairs[k][3],
+                'timestamp': pairs[k][1],
+                'frame_index': pairs[k][0],
+                'reason': 'outside_court_projection'
+            }
+            for k in np.nonzero(outside_court)[0]
+        ]
+        pairs = [pair for pair, outside in zip(pairs, outside_court) if not outside]
+
+        # 整批三角测量，再用一次向量比较完成边界过滤
+        points_3d, triangulated = self._triangulate_points(
+            [pair[2] for pair in pairs], [pair[3] for pair in pairs])
+        in_bounds = triangulated & self._points_in_bounds(points_3d)
+
+        # 记录三角测量失败的点对
+        self.triangulation_failed_points = [
+            {
+                'left_point': pairs[k][2],
+                'right_point': pairs[k][3],
+                'timestamp': pairs[k][1],
+                'frame_index': pairs[k][0],
+                'reason': 'triangulation_failed'
+            }
+            for k in np.nonzero(~triangulated)[0]
+        ]
+
+        # 记录被边界过滤排除的点
+        self.rejected_points = [
+            {
+                'point_3d': points_3d[k],
+                'timestamp': pairs[k][1],
+                'frame_index': pairs[k][0],
+                'reason': 'out_of_bounds',
+                'match_confidence': pairs[k][5],
+                'match_distance': pairs[k][4]
+            }
+            for k in np.nonzero(triangulated & ~in_bounds)[0]
+        ]
+
+        # 按帧分组有效3D点
+        frame_points = {}
+        for k in np.nonzero(in_bounds)[0]:
+            frame_index, timestamp = pairs[k][0], pairs[k][1]
+            all_3d_points.append(points_3d[k])
+            all_timestamps_3d.append(timestamp)
+            frame_points.setdefault(frame_index, (timestamp, []))[1].append((points_3d[k], pairs[k][5]))
+
+        # 按帧顺序更新多目标跟踪器（字典按帧的先后插入）
+        for timestamp, frame_3d_points in frame_points.values():
+            # 将3D点投影到2D用于跟踪（使用相机1的投影）
+            tracking_detections = []
+            for point_3d, conf in frame_3d_points:
+                # 简化投影：使用XY坐标作为2D位置
+                pos_2d = (int(point_3d[0] + 500), int(point_3d[1] + 500))  # 偏移到正值
+                tracking_detections.append((pos_2d, conf))
+
+            # 更新跟踪器
+            active_tracks = self.multi_tracker.update(tracking_detections, timestamp)
+
+            if len(active_tracks) > 1:
+                multi_track_frames += 1
+                max_active_tracks = max(max_active_tracks, len(active_tracks))
+
+        if multi_track_frames:
+            print(f"📍 Tracking multiple shuttlecocks in {multi_track_frames} frames "
+                  f"(up to {max_active_tracks} at once)")
 
         # 存储所有3D点
         self.all_3d_points = all_3d_points
@@ -703,11 +874,13 @@ class StereoProcessor:
         if len(tracks) > 1:
             print(f"🏸 Multiple shuttlecock tracks detected:")
             for track_id, track in tracks.items():
-                print(f"   Track {track_id}: {len(track['positions'])} points, "
-                      f"avg_conf={np.mean(track['confidences']):.3f}")
+                print(f"   Track {track_id}: {track['count']} points, "
+                      f"avg_conf={track['confidences'][:track['count']].mean():.3f}")
 
         print(f"Generated {len(all_3d_points)} valid 3D points from batch processing")
         print(f"Rejected {len(self.rejected_points)} out-of-bounds points")
+        if self.pruned_points:
+            print(f"Skipped triangulation for {len(self.pruned_points)} point pairs outside the court projection")
         print(f"Failed triangulation for {len(self.triangulation_failed_points)} point pairs")
 
         return all_3d_points, all_timestamps_3d
@@ -723,29 +896,27 @@ class StereoProcessor:
         if len(tracks) == 1:
             # 只有一个轨迹
             track_id, track = list(tracks.items())[0]
-            print(f"📍 Using single track {track_id} with {len(track['positions'])} points")
+            print(f"📍 Using single track {track_id} with {track['count']} points")
             return self.find_best_trajectory_for_prediction(current_time)
         
         # 多个轨迹，选择最佳的
         best_track_id, best_track = self.multi_tracker.get_best_track()
         if best_track_id is not None:
             print(f"🎯 Selected best track {best_track_id} from {len(tracks)} tracks")
-            print(f"   Track quality: {len(best_track['positions'])} points, "
+            print(f"   Track quality: {best_track['count']} points, "
                   f"missing_frames={best_track['missing_frames']}")
             
-            # 过滤轨迹数据并转换为3D点
-            track_3d_points = []
-            track_timestamps = []
-            
             # 在所有3D点中查找属于此轨迹的点
             # 这里简化处理，使用时间窗口匹配
             track_start_time = best_track['created_at']
-            track_end_time = best_track['timestamps'][-1] if best_track['timestamps'] else current_time
-            
-            for i, timestamp in enumerate(self.all_timestamps):
-                if track_start_time <= timestamp <= track_end_time + 0.1:  # 允许小误差
-                    track_3d_points.append(self.all_3d_points[i])
-                    track_timestamps.append(timestamp)
+            track_end_time = self.multi_tracker.last_timestamp(best_track)
+
+            # 3D点按帧顺序生成，时间戳单调不减，二分查找时间窗口的起止位置
+            all_timestamps = np.asarray(self.all_timestamps)
+            start_idx = np.searchsorted(all_timestamps, track_start_time, side='left')
+            end_idx = np.searchsorted(all_timestamps, track_end_time + 0.1, side='right')  # 允许小误差
+            track_3d_points = self.all_3d_points[start_idx:end_idx]
+            track_timestamps = self.all_timestamps[start_idx:end_idx]
             
             if len(track_3d_points) >= 5:
                 print(f"📊 Using {len(track_3d_points)} 3D points from best track")
@@ -761,104 +932,89 @@ class StereoProcessor:
         if not detections_left or not detections_right or self.fundamental_matrix is None:
             return []
 
-        matches = []
-
-        for left_point, left_conf in detections_left:
-            point_homo = np.array([left_point[0], left_point[1], 1])
-            epipolar_line = self.fundamental_matrix @ point_homo
-
-            best_match = None
-            min_distance = float('inf')
-            best_conf = 0
+        # 一次矩阵乘法得到所有左点的极线，再广播计算到所有右点的距离 [n_left, n_right]
+        left_h = np.array([(p[0], p[1], 1.0) for p, _ in detections_left], dtype=np.float64)
+        right_pts = np.array([p for p, _ in detections_right], dtype=np.float64)
+        lines = left_h @ self.fundamental_matrix.T
 
-            for right_point, right_conf in detections_right:
-                distance = abs(epipolar_line[0] * right_point[0] +
-                               epipolar_line[1] * right_point[1] +
-                               epipolar_line[2]) / np.sqrt(epipolar_line[0] ** 2 + epipolar_line[1] ** 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distances = (np.abs(lines[:, :1] * right_pts[:, 0] + lines[:, 1:2] * right_pts[:, 1] + lines[:, 2:3])
+                         / np.sqrt(lines[:, 0] ** 2 + lines[:, 1] ** 2)[:, None])
 
-                if distance < epipolar_threshold and distance < min_distance:
-                    min_distance = distance
-                    best_match = right_point
-                    best_conf = (left_conf + right_conf) / 2
+        # 超出阈值（或无效）的距离不参与匹配，每个左点取距离最小的右点
+        distances = np.where(distances < epipolar_threshold, distances, np.inf)
+        best_indices = np.argmin(distances, axis=1)
+        min_distances = distances[np.arange(len(best_indices)), best_indices]
 
-            if best_match is not None:
-                matches.append((left_point, best_match, min_distance, best_conf))
+        matches = []
+        for (left_point, left_conf), j, min_distance in zip(detections_left, best_indices, min_distances):
+            if np.isfinite(min_distance):
+                right_point, right_conf = detections_right[j]
+                matches.append((left_point, right_point, min_distance, (left_conf + right_conf) / 2))
 
         return matches
 
-    def _triangulate_point(self, point1, point2):
-        """三角测量计算3D点"""
-        if self.camera1_params is None or self.camera2_params is None:
-            return None
+    def _triangulate_points(self, points1, points2):
+        """批量三角测量计算3D点（光线中点法），返回 [N,3] 的3D点数组及各点对是否成功的布尔掩码"""
+        n_points = len(points1)
+        failed = (np.full((n_points, 3), np.nan), np.zeros(n_points, dtype=bool))
+        if n_points == 0 or self.camera1_params is None or self.camera2_params is None:
+            return failed
 
         try:
-            point1_normalized = cv2.undistortPoints(
-                np.array([point1], dtype=np.float32),
+            # 每个相机一次去畸变调用处理全部点
+            points1_normalized = cv2.undistortPoints(
+                np.asarray(points1, dtype=np.float32).reshape(-1, 1, 2),
                 self.camera1_params['camera_matrix'],
                 self.camera1_params['dist_coeffs']
-            )
+            ).reshape(-1, 2)
 
-            point2_normalized = cv2.undistortPoints(
-                np.array([point2], dtype=np.float32),
+            points2_normalized = cv2.undistortPoints(
+                np.asarray(points2, dtype=np.float32).reshape(-1, 1, 2),
                 self.camera2_params['camera_matrix'],
                 self.camera2_params['dist_coeffs']
-            )
-
-            ray1_dir = np.array([
-                point1_normalized[0][0][0],
-                point1_normalized[0][0][1],
-                1.0
-            ])
+            ).reshape(-1, 2)
 
-            ray2_dir = np.array([
-                point2_normalized[0][0][0],
-                point2_normalized[0][0][1],
-                1.0
-            ])
+            ones = np.ones((n_points, 1))
+            ray1_dir = np.hstack([points1_normalized, ones])
+            ray2_dir = np.hstack([points2_normalized, ones])
 
-            ray1_dir_world = self.camera1_params['rotation_matrix'].T @ ray1_dir
-            ray2_dir_world = self.camera2_params['rotation_matrix'].T @ ray2_dir
+            # 逐行计算 R.T @ ray，即 ray @ R
+            ray1_dir_world = ray1_dir @ self.camera1_params['rotation_matrix']
+            ray2_dir_world = ray2_dir @ self.camera2_params['rotation_matrix']
 
-            ray1_dir_world = ray1_dir_world / np.linalg.norm(ray1_dir_world)
-            ray2_dir_world = ray2_dir_world / np.linalg.norm(ray2_dir_world)
+            ray1_dir_world /= np.linalg.norm(ray1_dir_world, axis=1, keepdims=True)
+            ray2_dir_world /= np.linalg.norm(ray2_dir_world, axis=1, keepdims=True)
 
-            camera1_position = self.camera1_params['camera_position']
-            camera2_position = self.camera2_params['camera_position']
+            c1 = self.camera1_params['camera_center']
+            c2 = self.camera2_params['camera_center']
 
-            n = np.cross(ray1_dir_world.flatten(), ray2_dir_world.flatten())
+            n = np.cross(ray1_dir_world, ray2_dir_world)
+            parallel = np.linalg.norm(n, axis=1) < 1e-10
 
-            if np.linalg.norm(n) < 1e-10:
-                return None
+            n1 = np.cross(ray1_dir_world, n)
+            n2 = np.cross(ray2_dir_world, n)
 
-            n1 = np.cross(ray1_dir_world.flatten(), n)
-            n2 = np.cross(ray2_dir_world.flatten(), n)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t1 = ((c2 - c1) @ n2.T) / np.einsum('ij,ij->i', ray1_dir_world, n2)
+                t2 = ((c1 - c2) @ n1.T) / np.einsum('ij,ij->i', ray2_dir_world, n1)
 
-            c1 = camera1_position.flatten()
-            c2 = camera2_position.flatten()
+            p1 = c1 + t1[:, None] * ray1_dir_world
+            p2 = c2 + t2[:, None] * ray2_dir_world
 
-            t1 = np.dot((c2 - c1), n2) / np.dot(ray1_dir_world.flatten(), n2)
-            t2 = np.dot((c1 - c2), n1) / np.dot(ray2_dir_world.flatten(), n1)
+            points_3d = (p1 + p2) / 2
 
-            p1 = c1 + t1 * ray1_dir_world.flatten()
-            p2 = c2 + t2 * ray2_dir_world.flatten()
-
-            point_3d = (p1 + p2) / 2
-
-            return point_3d
+            return points_3d, ~parallel
 
         except Exception as e:
-            return None
-
-    def _is_point_in_bounds(self, point_3d):
-        """检查3D点是否在扩展边界内"""
-        if point_3d is None or len(point_3d) < 3:
-            return False
+            return failed
 
-        x, y, z = point_3d[0], point_3d[1], point_3d[2]
+    def _points_in_bounds(self, points_3d):
+        """检查一组3D点 [N,3] 是否在扩展边界内，返回布尔掩码"""
+        lower = np.array([self.court_bounds['x_min'], self.court_bounds['y_min'], self.court_bounds['z_min']])
+        upper = np.array([self.court_bounds['x_max'], self.court_bounds['y_max'], self.court_bounds['z_max']])
 
-        return (self.court_bounds['x_min'] <= x <= self.court_bounds['x_max'] and
-                self.court_bounds['y_min'] <= y <= self.court_bounds['y_max'] and
-                self.court_bounds['z_min'] <= z <= self.court_bounds['z_max'])
+        return np.all((points_3d >= lower) & (points_3d <= upper), axis=1)
 
     def find_best_trajectory_for_prediction(self, current_time):
         """找到最适合预测的轨迹片段 - 记录被排除的低质量点"""
@@ -867,28 +1023,24 @@ class StereoProcessor:
 
         # 在寻找最佳轨迹之前，记录所有不符合质量要求的点
         # 这里可以添加更复杂的质量评估逻辑
-        for i, (point, timestamp) in enumerate(zip(self.all_3d_points, self.all_timestamps)):
-            # 简单的质量检查示例
-            if i > 0:
-                prev_point = self.all_3d_points[i - 1]
-                prev_time = self.all_timestamps[i - 1]
-
-                # 检查距离和时间间隔的合理性
-                distance = np.linalg.norm(point - prev_point)
-                time_diff = timestamp - prev_time
-
-                if time_diff > 0:
-                    velocity = distance / time_diff
-                    # 如果速度异常高，标记为低质量点
-                    if velocity > 2000:  # 20m/s
-                        self.low_quality_points.append({
-                            'point_3d': point,
-                            'timestamp': timestamp,
-                            'reason': 'high_velocity',
-                            'velocity': velocity,
-                            'distance': distance,
-                            'time_diff': time_diff
-                        })
+        # 相邻点的距离用逐行点积开方计算，只对超速的点逐个记录
+        steps = np.diff(np.asarray(self.all_3d_points), axis=0)
+        distances = np.sqrt(np.einsum('ij,ij->i', steps, steps))
+        time_diffs = np.diff(np.asarray(self.all_timestamps))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            velocities = distances / time_diffs
+
+        # 如果速度异常高，标记为低质量点
+        for i in np.nonzero((time_diffs > 0) & (velocities > 2000))[0]:  # 20m/s
+            self.low_quality_points.append({
+                'point_3d': self.all_3d_points[i + 1],
+                'timestamp': self.all_timestamps[i + 1],
+                'reason': 'high_velocity',
+                'velocity': velocities[i],
+                'distance': distances[i],
+                'time_diff': time_diffs[i]
+            })
 
         best_points, best_timestamps, confidence = self.trajectory_manager.find_best_trajectory_segment(
             self.all_3d_points, self.all_timestamps, current_time
@@ -903,7 +1055,8 @@ class StereoProcessor:
             'all_timestamps': self.all_timestamps,
             'rejected_points': self.rejected_points,
             'low_quality_points': self.low_quality_points,
-            'triangulation_failed_points': self.triangulation_failed_points
+            'triangulation_failed_points': self.triangulation_failed_points,
+            'pruned_points': self.pruned_points
         }
 
     def reset(self):
@@ -913,4 +1066,5 @@ class StereoProcessor:
         self.rejected_points = []
         self.low_quality_points = []
         self.triangulation_failed_points = []
+        self.pruned_points = []
         print("StereoProcessor reset")
\ No newline at end of file
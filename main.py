@@ -6,6 +6,7 @@ import numpy as np
 import time
 import argparse
 from enum import Enum
+from functools import lru_cache
 
 from utils import config, UIHelper
 from calibration import calibrate_cameras
@@ -15,6 +16,16 @@ from visualization_3d import Interactive3DVisualizer
 from network_camera import NetworkCameraManager
 from video_controls import EnhancedVideoControls
 
+# 3D可视化元素切换按键映射
+VIZ_ELEMENT_KEYS = {
+    ord('1'): 'all_valid',
+    ord('2'): 'prediction',
+    ord('3'): 'rejected',
+    ord('4'): 'low_quality',
+    ord('5'): 'triangulation_failed',
+    ord('6'): 'predicted_trajectory'
+}
+
 
 class SystemState(Enum):
     """系统状态枚举"""
@@ -24,6 +35,21 @@ class SystemState(Enum):
     PREDICTION_COMPLETE = "prediction_complete"
 
 
+# 状态栏各文字行的起始行：第1行（状态/时间）与第3行（预测统计）按内容缓存，
+# 第2行（缓冲/帧信息）逐帧绘制，控制提示区域为静态内容
+STATUS_ROW2_TOP = 34
+STATUS_ROW3_TOP = 60
+STATUS_CONTROLS_TOP = 88
+
+# 状态栏中各系统状态的显示颜色
+STATE_COLORS = {
+    SystemState.BUFFERING: (0, 255, 0),
+    SystemState.PROCESSING: (255, 255, 0),
+    SystemState.PREDICTION_READY: (255, 165, 0),
+    SystemState.PREDICTION_COMPLETE: (0, 255, 255)
+}
+
+
 class BufferedBadmintonSystem:
     """基于图像缓冲的羽毛球落点预测系统 - 完全修复版"""
 
@@ -89,6 +115,19 @@ class BufferedBadmintonSystem:
         self.current_frame1 = None
         self.current_frame2 = None
 
+        # 网络模式下最近一次处理的帧对（用于识别未更新的重复帧）及显示刷新标记
+        self._last_network_frames = (None, None)
+        self._display_dirty = False
+
+        # 键盘事件分发表
+        self._key_bindings = self._build_key_bindings()
+
+        # 状态栏按行缓存的文字图像 {起始行: (内容键, 行图像)}
+        self._status_row_cache = {}
+
+        # 显示画布（双路视频 + 状态栏），每帧复用，避免重复分配
+        self._display_canvas = np.zeros((480 + 160, 640 * 2, 3), dtype=np.uint8)
+
         # 系统性能监控
         self.system_start_time = time.time()
         self.total_predictions = 0
@@ -544,6 +583,7 @@ class BufferedBadmintonSystem:
         rejected_points = len(debug_data.get('rejected_points', []))
         low_quality = len(debug_data.get('low_quality_points', []))
         failed_triangulation = len(debug_data.get('triangulation_failed_points', []))
+        pruned = len(debug_data.get('pruned_points', []))
 
         print(f"📈 Data Statistics:")
         print(f"   All valid points (150 frames): {all_points}")
@@ -552,6 +592,7 @@ class BufferedBadmintonSystem:
         print(f"   Rejected (out-of-bounds): {rejected_points}")
         print(f"   Low quality: {low_quality}")
         print(f"   Failed triangulation: {failed_triangulation}")
+        print(f"   Pruned (outside court projection): {pruned}")
 
         # 轨迹质量分析
         if selected_trajectory and len(selected_trajectory) > 1:
@@ -618,8 +659,8 @@ class BufferedBadmintonSystem:
 
                 # 2. 帧率控制
                 if not self._should_process_frame(loop_start_time):
-                    # 在等待期间处理背景任务
-                    self._handle_background_tasks()
+                    # 在等待期间处理背景任务，按键等待直接睡到下一帧时刻，避免空转轮询
+                    self._handle_background_tasks(self._time_until_next_frame(loop_start_time))
                     continue
 
                 # 3. 读取和处理视频帧
@@ -630,8 +671,8 @@ class BufferedBadmintonSystem:
                 # 4. 更新显示
                 self._update_display()
 
-                # 5. 处理背景任务
-                self._handle_background_tasks()
+                # 5. 处理背景任务，同时等待到下一帧时刻（每帧只需一次按键等待）
+                self._handle_background_tasks(self._time_until_next_frame(time.time()))
 
                 # 6. 性能监控
                 self._monitor_performance()
@@ -664,7 +705,7 @@ class BufferedBadmintonSystem:
         print("   🔍 V         - Toggle 3D visualization window")
         print("   ❌ Q         - Close 3D visualization window")
         print("   📊 D         - Print detailed debug statistics")
-        print("   ❓ H         - Show complete help screen")
+        print("   ❓ H         - Show/hide complete help screen")
         print("   🔄 R         - Complete system reset")
         print("   ⏩ +/=       - Increase playback speed")
         print("   ⏪ -/_       - Decrease playback speed")
@@ -702,6 +743,12 @@ class BufferedBadmintonSystem:
         target_frame_time = self.frame_time / self.playback_speed
         return elapsed_since_last_frame >= target_frame_time
 
+    def _time_until_next_frame(self, current_time):
+        """距离下一帧的等待时间（毫秒，至少1ms）"""
+        target_frame_time = self.frame_time / self.playback_speed
+        remaining = self.last_frame_time + target_frame_time - current_time
+        return max(1, int(remaining * 1000))
+
     def _process_video_frame(self):
         """处理视频帧 - 增强版本，支持网络摄像头和进度条"""
         if self.network_mode:
@@ -721,21 +768,28 @@ class BufferedBadmintonSystem:
         
         if not ret1 or not ret2 or frame1 is None or frame2 is None:
             return True  # 网络流可能暂时无数据，继续运行
+
+        # 两路都没有新帧时跳过，避免重复缓冲同一帧和重复刷新显示
+        if frame1 is self._last_network_frames[0] and frame2 is self._last_network_frames[1]:
+            return True
+        self._last_network_frames = (frame1, frame2)
         
         # 更新时间基准
         self.last_frame_time = time.time()
         
         # 更新帧计数和FPS
         self.frame_count += 1
-        self._update_fps()
+        self._update_fps(self.last_frame_time)
         
         # 添加到缓冲区（只在缓冲状态且未处理时）
         if self.state == SystemState.BUFFERING and not self.processing_lock:
             self.buffered_processor.add_frame_pair(frame1, frame2, self.last_frame_time)
         
-        # 保存当前帧用于显示
-        self.current_frame1 = frame1.copy() if frame1 is not None else np.zeros((480, 640, 3), dtype=np.uint8)
-        self.current_frame2 = frame2.copy() if frame2 is not None else np.zeros((480, 640, 3), dtype=np.uint8)
+        # 保存当前帧用于显示（每帧都是新解码的数组，读取线程不会原地修改，无需整帧拷贝，
+        # 显示时直接缩放到画布）
+        self.current_frame1 = frame1
+        self.current_frame2 = frame2
+        self._display_dirty = True
         
         return True
     
@@ -767,7 +821,7 @@ class BufferedBadmintonSystem:
 
         # 更新帧计数和FPS
         self.frame_count += 1
-        self._update_fps()
+        self._update_fps(self.last_frame_time)
 
         # 添加到缓冲区（只在缓冲状态且未处理时）
         if self.state == SystemState.BUFFERING and not self.processing_lock:
@@ -776,6 +830,7 @@ class BufferedBadmintonSystem:
         # 保存当前帧用于显示
         self.current_frame1 = frame1 if frame1 is not None else np.zeros((480, 640, 3), dtype=np.uint8)
         self.current_frame2 = frame2 if frame2 is not None else np.zeros((480, 640, 3), dtype=np.uint8)
+        self._display_dirty = True
 
         return True
     
@@ -792,7 +847,11 @@ class BufferedBadmintonSystem:
             print(f"📍 Seeked to frame {frame_number}")
 
     def _update_display(self):
-        """更新显示 - 增强版本，支持进度条"""
+        """更新显示 - 增强版本，支持进度条（仅在有新帧时重绘）"""
+        if not self._display_dirty:
+            return
+        self._display_dirty = False
+
         if hasattr(self, 'current_frame1') and hasattr(self, 'current_frame2'):
             display_frame = self._create_display_frame(self.current_frame1, self.current_frame2)
             if display_frame is not None:
@@ -809,8 +868,8 @@ class BufferedBadmintonSystem:
                     else:
                         cv2.imshow('Enhanced Badminton System - Live View', display_frame)
 
-    def _handle_background_tasks(self):
-        """处理背景任务 - 优化版本"""
+    def _handle_background_tasks(self, wait_ms=1):
+        """处理背景任务 - 优化版本（wait_ms为按键等待时长）"""
         # 1. 更新3D可视化（非阻塞）
         if self.interactive_3d_viz:
             try:
@@ -819,7 +878,7 @@ class BufferedBadmintonSystem:
                 print(f"⚠️ 3D visualization background update error: {e}")
 
         # 2. 处理键盘事件
-        key = cv2.waitKey(1) & 0xFF
+        key = cv2.waitKey(wait_ms) & 0xFF
         if key != 255:  # 有按键
             self._handle_keyboard_input(key, time.time())
 
@@ -828,48 +887,41 @@ class BufferedBadmintonSystem:
         # 可以在这里添加性能监控逻辑
         pass
 
-    def _handle_keyboard_input(self, key, current_time):
-        """统一的键盘事件处理 - 完全重写"""
-        if key == 27:  # ESC - 退出
-            self.running = False
-            print("🚪 Exit requested by user")
-
-        elif key == ord(' '):  # SPACE - 暂停/恢复播放
-            self._handle_space_key()
-
-        elif key == ord('t') or key == ord('T'):  # T - 触发预测
-            self._handle_prediction_trigger(current_time)
-
-        elif key == ord('p') or key == ord('P'):  # P - 恢复播放
-            self._handle_resume_playback()
-
-        elif key == ord('v') or key == ord('V'):  # V - 切换3D可视化
-            self._handle_toggle_3d_visualization()
-
-        elif key == ord('q') or key == ord('Q'):  # Q - 关闭3D窗口
-            self._handle_close_3d_window()
-
-        elif key == ord('d') or key == ord('D'):  # D - 打印调试统计
-            self._handle_debug_statistics()
-
-        elif key == ord('h') or key == ord('H'):  # H - 帮助
-            UIHelper.display_help_screen()
+    def _build_key_bindings(self):
+        """构建按键绑定表：按键码 -> handler(current_time)，启动时构建一次"""
+        bindings = {
+            (27,): self._handle_exit_request,                                     # ESC - 退出
+            (ord(' '),): lambda t: self._handle_space_key(),                      # SPACE - 暂停/恢复播放
+            (ord('t'), ord('T')): self._handle_prediction_trigger,                # T - 触发预测
+            (ord('p'), ord('P')): lambda t: self._handle_resume_playback(),       # P - 恢复播放
+            (ord('v'), ord('V')): lambda t: self._handle_toggle_3d_visualization(),  # V - 切换3D可视化
+            (ord('q'), ord('Q')): lambda t: self._handle_close_3d_window(),       # Q - 关闭3D窗口
+            (ord('d'), ord('D')): lambda t: self._handle_debug_statistics(),      # D - 打印调试统计
+            (ord('h'), ord('H')): lambda t: UIHelper.toggle_help_screen(),        # H - 帮助（再按一次关闭）
+            (ord('r'), ord('R')): lambda t: self._handle_system_reset(),          # R - 重置系统
+            (ord('+'), ord('=')): lambda t: self._handle_speed_change(1.2),       # 增加播放速度
+            (ord('-'), ord('_')): lambda t: self._handle_speed_change(1 / 1.2),   # 减少播放速度
+            (ord('0'),): lambda t: self._handle_speed_reset(),                    # 重置到正常速度
+        }
 
-        elif key == ord('r') or key == ord('R'):  # R - 重置系统
-            self._handle_system_reset()
+        key_bindings = {key: handler for keys, handler in bindings.items() for key in keys}
 
-        elif key == ord('+') or key == ord('='):  # 增加播放速度
-            self._handle_speed_change(1.2)
+        # 3D可视化元素切换
+        for key in VIZ_ELEMENT_KEYS:
+            key_bindings[key] = lambda t, k=key: self._handle_3d_element_toggle(k)
 
-        elif key == ord('-') or key == ord('_'):  # 减少播放速度
-            self._handle_speed_change(1 / 1.2)
+        return key_bindings
 
-        elif key == ord('0'):  # 重置到正常速度
-            self._handle_speed_reset()
+    def _handle_keyboard_input(self, key, current_time):
+        """统一的键盘事件处理 - 按绑定表分发"""
+        handler = self._key_bindings.get(key)
+        if handler:
+            handler(current_time)
 
-        # 3D可视化元素切换
-        elif key in [ord('1'), ord('2'), ord('3'), ord('4'), ord('5'), ord('6')]:
-            self._handle_3d_element_toggle(key)
+    def _handle_exit_request(self, current_time):
+        """处理ESC - 退出"""
+        self.running = False
+        print("🚪 Exit requested by user")
 
     def _handle_space_key(self):
         """处理空格键 - 暂停/恢复"""
@@ -1040,16 +1092,7 @@ class BufferedBadmintonSystem:
             print("❌ 3D visualizer not available")
             return
 
-        element_map = {
-            ord('1'): 'all_valid',
-            ord('2'): 'prediction',
-            ord('3'): 'rejected',
-            ord('4'): 'low_quality',
-            ord('5'): 'triangulation_failed',
-            ord('6'): 'predicted_trajectory'
-        }
-
-        element_type = element_map.get(key)
+        element_type = VIZ_ELEMENT_KEYS.get(key)
         if element_type:
             try:
                 self.interactive_3d_viz.toggle_visualization_elements(element_type)
@@ -1057,69 +1100,56 @@ class BufferedBadmintonSystem:
                 print(f"❌ Error toggling 3D element: {e}")
 
     def _create_display_frame(self, frame1, frame2):
-        """创建显示帧 - 完全重写"""
+        """创建显示帧 - 直接写入复用的显示画布"""
         if frame1 is None and frame2 is None:
             return None
 
         # 调整帧大小
         display_height = 480
         display_width = 640
+        canvas = self._display_canvas
 
-        if frame1 is not None:
-            frame1_resized = cv2.resize(frame1, (display_width, display_height))
-        else:
-            frame1_resized = np.zeros((display_height, display_width, 3), dtype=np.uint8)
-
-        if frame2 is not None:
-            frame2_resized = cv2.resize(frame2, (display_width, display_height))
-        else:
-            frame2_resized = np.zeros((display_height, display_width, 3), dtype=np.uint8)
-
-        # 水平拼接主视频
-        combined_frame = np.hstack([frame1_resized, frame2_resized])
-
-        # 创建增强状态栏
-        status_bar = self._create_enhanced_status_bar(combined_frame.shape[1])
+        # 两路视频直接缩放到画布对应区域，省去hstack/vstack的中间拷贝
+        for i, frame in enumerate((frame1, frame2)):
+            region = canvas[:display_height, i * display_width:(i + 1) * display_width]
+            if frame is not None:
+                cv2.resize(frame, (display_width, display_height), dst=region)
+            else:
+                region.fill(0)
 
-        # 垂直拼接
-        final_frame = np.vstack([combined_frame, status_bar])
+        # 在画布底部绘制增强状态栏
+        self._create_enhanced_status_bar(canvas.shape[1], out=canvas[display_height:])
 
-        return final_frame
+        return canvas
 
-    def _create_enhanced_status_bar(self, width):
-        """创建增强状态栏"""
-        status_bar = np.zeros((160, width, 3), dtype=np.uint8)
+    def _create_enhanced_status_bar(self, width, out=None):
+        """创建增强状态栏（提供out时清空并直接绘制到该区域）"""
+        if out is None:
+            status_bar = np.zeros((160, width, 3), dtype=np.uint8)
+        else:
+            status_bar = out
+            status_bar[STATUS_ROW2_TOP:STATUS_ROW3_TOP].fill(0)
 
         # 系统状态显示
-        state_colors = {
-            SystemState.BUFFERING: (0, 255, 0),
-            SystemState.PROCESSING: (255, 255, 0),
-            SystemState.PREDICTION_READY: (255, 165, 0),
-            SystemState.PREDICTION_COMPLETE: (0, 255, 255)
-        }
-
-        state_color = state_colors.get(self.state, (255, 255, 255))
+        state_color = STATE_COLORS.get(self.state, (255, 255, 255))
         state_text = f"State: {self.state.value.upper()}"
         if self.processing_lock:
             state_text += " [LOCKED]"
 
-        cv2.putText(status_bar, state_text, (10, 25),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, state_color, 2)
+        status_items = [(state_text, (10, 25), 0.7, state_color, 2)]
 
         # 3D窗口状态
         if self.interactive_3d_viz:
             viz_status = "OPEN" if self.interactive_3d_viz.window_visible else "CLOSED"
             viz_color = (0, 255, 255) if self.interactive_3d_viz.window_visible else (100, 100, 100)
-            cv2.putText(status_bar, f"3D Debug: {viz_status}", (350, 25),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, viz_color, 2)
+            status_items.append((f"3D Debug: {viz_status}", (350, 25), 0.6, viz_color, 2))
 
         # 时间和用户信息
         current_time_str = time.strftime('%H:%M:%S UTC')
-        cv2.putText(status_bar, f"Time: {current_time_str}", (650, 25),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        status_items.append((f"Time: {current_time_str}", (650, 25), 0.5, (255, 255, 255), 1))
+        status_items.append((f"User: Liao-cyber360", (900, 25), 0.5, (200, 200, 200), 1))
 
-        cv2.putText(status_bar, f"User: Liao-cyber360", (900, 25),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+        self._blit_status_row(status_bar, 0, STATUS_ROW2_TOP, status_items)
 
         # 缓冲区和性能信息
         if self.buffered_processor:
@@ -1142,44 +1172,77 @@ class BufferedBadmintonSystem:
         cv2.putText(status_bar, f"FPS: {self.actual_fps:.1f} | Frame: {self.frame_count}",
                     (650, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
 
+        stats_items = []
+
         # 预测统计
         if self.total_predictions > 0:
             success_rate = (self.successful_predictions / self.total_predictions) * 100
-            cv2.putText(status_bar,
-                        f"Predictions: {self.successful_predictions}/{self.total_predictions} ({success_rate:.1f}%)",
-                        (10, 75), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+            stats_items.append((
+                f"Predictions: {self.successful_predictions}/{self.total_predictions} ({success_rate:.1f}%)",
+                (10, 75), 0.5, (0, 255, 255), 1))
 
         # 调试数据显示
-        if self.current_trajectory_data and 'debug_data' in self.current_trajectory_data:
-            debug_data = self.current_trajectory_data['debug_data']
-            debug_text = f"Debug: V:{len(debug_data.get('all_valid_points', []))} P:{len(debug_data.get('prediction_points', []))} R:{len(debug_data.get('rejected_points', []))}"
-            cv2.putText(status_bar, debug_text, (350, 75),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1)
+        # 每帧执行：一次取出调试数据，缺省值用常量空元组，不创建临时列表
+        debug_data = self.current_trajectory_data.get('debug_data') if self.current_trajectory_data else None
+        if debug_data is not None:
+            debug_text = f"Debug: V:{len(debug_data.get('all_valid_points', ()))} P:{len(debug_data.get('prediction_points', ()))} R:{len(debug_data.get('rejected_points', ()))}"
+            stats_items.append((debug_text, (350, 75), 0.45, (0, 255, 255), 1))
+
+        self._blit_status_row(status_bar, STATUS_ROW3_TOP, STATUS_CONTROLS_TOP, stats_items)
+
+        # 控制提示行（静态内容，按宽度和暂停状态缓存后整块拷贝）
+        status_bar[STATUS_CONTROLS_TOP:] = self._render_status_controls(width, self.paused)
+
+        return status_bar
+
+    def _blit_status_row(self, status_bar, top, bottom, items):
+        """
+        绘制状态栏中的一行文字
+
+        items为 (文字, 位置, 字号, 颜色, 线宽) 列表；与上次绘制内容相同时
+        直接拷贝缓存的行图像，不再重复调用putText
+        """
+        key = (status_bar.shape[1], tuple(items))
+        cached = self._status_row_cache.get(top)
+        if cached is None or cached[0] != key:
+            row = np.zeros((bottom - top, status_bar.shape[1], 3), dtype=np.uint8)
+            for text, (x, y), scale, color, thickness in items:
+                cv2.putText(row, text, (x, y - top), cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+            cached = (key, row)
+            self._status_row_cache[top] = cached
+        status_bar[top:bottom] = cached[1]
+
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _render_status_controls(width, paused):
+        """绘制状态栏底部的控制提示行（内容只随暂停状态变化，返回只读图像）"""
+        controls = np.zeros((160 - STATUS_CONTROLS_TOP, width, 3), dtype=np.uint8)
+        top = STATUS_CONTROLS_TOP
 
         # 控制提示行1
-        if self.paused:
+        if paused:
             controls1 = "⏸️  PAUSED: T:Predict | P:Resume | V:3D | D:Debug | R:Reset | H:Help"
         else:
             controls1 = "▶️  PLAYING: SPACE:Pause | V:3D | D:Debug | R:Reset | H:Help"
 
-        cv2.putText(status_bar, controls1, (10, 105),
+        cv2.putText(controls, controls1, (10, 105 - top),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
 
         # 控制提示行2
         controls2 = "3D Controls: 1:AllValid 2:Prediction 3:Rejected 4:LowQuality 5:TriFailed 6:Trajectory"
-        cv2.putText(status_bar, controls2, (10, 125),
+        cv2.putText(controls, controls2, (10, 125 - top),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.35, (150, 200, 255), 1)
 
         # 控制提示行3
         controls3 = "Playback: +/-:Speed 0:Reset | System: Q:Close3D ESC:Exit"
-        cv2.putText(status_bar, controls3, (10, 145),
+        cv2.putText(controls, controls3, (10, 145 - top),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.35, (150, 200, 255), 1)
 
-        return status_bar
+        controls.setflags(write=False)
+        return controls
 
-    def _update_fps(self):
-        """更新FPS计算"""
-        current_time = time.time()
+    def _update_fps(self, current_time):
+        """更新FPS计算（使用本帧已取得的时间戳，避免重复读取时钟）"""
         self.fps_counter += 1
 
         if current_time - self.fps_prev_time >= 1.0:
@@ -21,6 +21,12 @@ class MJPEGStreamReader:
         self.frame_buffer = deque(maxlen=buffer_size)
         self.timestamp_buffer = deque(maxlen=buffer_size)
 
+        # 新帧通知：每存入一帧序号加一并唤醒等待者
+        # （服务器重复发送的相同JPEG不计为新帧，但仍照常进入缓冲区）
+        self.frame_condition = threading.Condition()
+        self.frame_id = 0
+        self._last_frame_data = None
+
         # 控制变量
         self.running = False
         self.paused = False
@@ -73,6 +79,20 @@ class MJPEGStreamReader:
             return None, None
         return self.frame_buffer[-1], self.timestamp_buffer[-1]
 
+    def wait_for_frame(self, last_frame_id, timeout=1.0):
+        """
+        等待比 last_frame_id 更新的帧
+
+        返回:
+            (frame, frame_id): 最新帧及其序号；超时返回 (None, last_frame_id)
+        """
+        with self.frame_condition:
+            if not self.frame_condition.wait_for(lambda: self.frame_id > last_frame_id, timeout):
+                return None, last_frame_id
+            if not self.frame_buffer:
+                return None, self.frame_id
+            return self.frame_buffer[-1], self.frame_id
+
     def get_buffered_frames(self):
         """获取所有缓冲的帧"""
         return list(self.frame_buffer), list(self.timestamp_buffer)
@@ -189,6 +209,8 @@ class MJPEGStreamReader:
         buffer = b''
         in_frame = False
         headers = {}
+        # 边界标记只需编码一次，不必在每个数据块上重复拼接
+        boundary_marker = b'--' + boundary.encode()
 
         for chunk in response.iter_content(chunk_size=4096):
             if not self.running:
@@ -202,7 +224,7 @@ class MJPEGStreamReader:
             while True:
                 if not in_frame:
                     # 查找边界标记
-                    boundary_pos = buffer.find(b'--' + boundary.encode())
+                    boundary_pos = buffer.find(boundary_marker)
                     if boundary_pos == -1:
                         break
 
@@ -224,7 +246,7 @@ class MJPEGStreamReader:
                         headers[key.strip()] = val.strip()
 
                 # 查找帧结束标记
-                frame_end = buffer.find(b'--' + boundary.encode(), header_end + 4)
+                frame_end = buffer.find(boundary_marker, header_end + 4)
                 if frame_end == -1:
                     break
 
@@ -262,9 +284,14 @@ class MJPEGStreamReader:
 
             self.last_timestamp = timestamp
 
-            # 存储到缓冲区
-            self.frame_buffer.append(frame)
-            self.timestamp_buffer.append(timestamp)
+            # 存储到缓冲区并通知等待新帧的消费者
+            with self.frame_condition:
+                self.frame_buffer.append(frame)
+                self.timestamp_buffer.append(timestamp)
+                if frame_data != self._last_frame_data:
+                    self.frame_id += 1
+                    self.frame_condition.notify_all()
+            self._last_frame_data = frame_data
 
 
 class NetworkCameraManager:
@@ -364,6 +391,10 @@ class NetworkCameraManager:
             # 单摄像头模式，返回相同帧
             return (frame1 is not None, frame1 is not None), (frame1, frame1)
 
+    def wait_for_new_frame(self, last_frame_id=0, timeout=1.0):
+        """等待摄像头1的新帧，返回 (frame, frame_id)，用法见 MJPEGStreamReader.wait_for_frame"""
+        return self.stream1.wait_for_frame(last_frame_id, timeout)
+
     def get_buffered_frames(self):
         """获取所有缓冲的帧"""
         frames1, ts1 = self.stream1.get_buffered_frames()
@@ -102,6 +102,116 @@ def test_main_integration():
         traceback.print_exc()
         return False
 
+def test_consolidate_corner_points():
+    """Test corner clustering (single-linkage within threshold)"""
+    import pytest
+    pytest.importorskip("ultralytics")
+    pytest.importorskip("scipy")
+    from calibration import BadmintonCalibrator
+
+    # 聚类只依赖 manual_corners，无需加载模型
+    calibrator = BadmintonCalibrator.__new__(BadmintonCalibrator)
+    calibrator.manual_corners = []
+
+    # 相邻间距20 < 30 的一串点合并为一个角点，即使首尾相距80
+    chain = [(100, 100), (120, 100), (140, 100), (160, 100), (180, 100)]
+    assert calibrator.consolidate_corner_points(chain, threshold=30) == [(140, 100)]
+    # 链的输入顺序不影响结果
+    assert calibrator.consolidate_corner_points(chain[::-1], threshold=30) == [(140, 100)]
+
+    # 两个相距很远的聚类分别合并，按首次出现顺序输出，中心取整
+    clusters = [(10, 10), (500, 500), (12, 14), (505, 497)]
+    assert calibrator.consolidate_corner_points(clusters, threshold=30) == [(11, 12), (502, 498)]
+
+    # 距离恰好等于阈值的点不合并
+    assert calibrator.consolidate_corner_points([(0, 0), (30, 0)], threshold=30) == [(0, 0), (30, 0)]
+
+    # 手动角点：靠近已有中心的不重复添加，远离的追加到末尾
+    calibrator.manual_corners = [(12, 12), (900, 900)]
+    assert calibrator.consolidate_corner_points(clusters, threshold=30) == [(11, 12), (502, 498), (900, 900)]
+
+    print("✅ Corner clustering output is correct")
+    return True
+
+def _assert_same_params(loaded, expected):
+    """Compare loaded parameters with expected values (shape, dtype and value)"""
+    assert set(loaded) == set(expected), f"Keys differ: {set(loaded) ^ set(expected)}"
+    for key, value in expected.items():
+        if isinstance(value, np.ndarray):
+            assert isinstance(loaded[key], np.ndarray), f"{key} is not an array"
+            assert loaded[key].shape == value.shape, f"{key} shape {loaded[key].shape} != {value.shape}"
+            assert loaded[key].dtype == value.dtype, f"{key} dtype {loaded[key].dtype} != {value.dtype}"
+            assert np.array_equal(loaded[key], value), f"{key} values differ"
+        else:
+            assert type(loaded[key]) is type(value) and loaded[key] == value, f"{key}: {loaded[key]!r} != {value!r}"
+
+def test_opencv_yaml_round_trip():
+    """Test save_opencv_yaml/load_opencv_yaml interoperability with cv2.FileStorage"""
+    import os
+    import tempfile
+    from unittest import mock
+    import cv2
+    import utils
+    from utils import load_opencv_yaml, save_opencv_yaml
+
+    rng = np.random.default_rng(0)
+    data = {
+        "camera_matrix": np.array([[812.5, 0.0, 640.25], [0.0, 809.75, 360.5], [0.0, 0.0, 1.0]]),
+        "distortion_coefficients": rng.normal(scale=0.1, size=5),
+        "rotation_vector": rng.normal(size=(3, 1)),
+        "projection_matrix": rng.normal(scale=1e3, size=(3, 4)),
+        "mask_counts": np.arange(6, dtype=np.int32).reshape(2, 3),
+        "float_matrix": rng.random((2, 2)).astype(np.float32),
+        "calibration_date": "2024-01-02_03-04-05",
+        "image_width": 1280,
+        "image_height": 720,
+        "reprojection_error": 0.4375,
+    }
+    # 一维数组按单列矩阵保存
+    expected = {key: value.reshape(-1, 1) if isinstance(value, np.ndarray) and value.ndim == 1 else value
+                for key, value in data.items()}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 1. save_opencv_yaml 写入，cv2.FileStorage 读回
+        saved_file = os.path.join(tmp_dir, "saved.yaml")
+        save_opencv_yaml(saved_file, data)
+        assert not os.path.exists(saved_file + ".tmp"), "Temporary file left behind"
+
+        fs = cv2.FileStorage(saved_file, cv2.FILE_STORAGE_READ)
+        assert fs.isOpened(), "cv2.FileStorage cannot open the saved file"
+        read_back = {}
+        for key in fs.root().keys():
+            node = fs.getNode(key)
+            if node.isString():
+                read_back[key] = node.string()
+            elif node.isInt():
+                read_back[key] = int(node.real())
+            elif node.isReal():
+                read_back[key] = node.real()
+            else:
+                read_back[key] = node.mat()
+        fs.release()
+        _assert_same_params(read_back, expected)
+        print("✅ save_opencv_yaml output is readable by cv2.FileStorage")
+
+        # 2. cv2.FileStorage 写入，load_opencv_yaml 读回（直接解析与回退路径）
+        opencv_file = os.path.join(tmp_dir, "opencv.yaml")
+        fs = cv2.FileStorage(opencv_file, cv2.FILE_STORAGE_WRITE)
+        for key, value in expected.items():
+            fs.write(key, value)
+        fs.release()
+
+        _assert_same_params(load_opencv_yaml(opencv_file), expected)
+        with mock.patch.object(utils, "yaml", None):
+            _assert_same_params(load_opencv_yaml(opencv_file), expected)
+        print("✅ load_opencv_yaml reads files written by cv2.FileStorage")
+
+        # 3. 自身写入的文件也能按原样读回
+        _assert_same_params(load_opencv_yaml(saved_file), expected)
+        print("✅ save_opencv_yaml/load_opencv_yaml round trip is lossless")
+
+    return True
+
 def main():
     """Run all tests"""
     print("=" * 60)
@@ -112,6 +222,8 @@ def main():
         ("Basic Import Test", test_camera_calibration_import),
         ("Function Test", test_calibrate_cameras_from_live_feed),
         ("Main Integration Test", test_main_integration),
+        ("Corner Clustering Test", test_consolidate_corner_points),
+        ("OpenCV YAML Round Trip Test", test_opencv_yaml_round_trip),
     ]
     
     results = []
@@ -121,6 +121,252 @@ def test_max_speed_calculation():
         print(f"❌ Speed calculation test failed: {e}")
         return False
 
+def test_tracker_ring_history():
+    """Test MultiObjectTracker ring-buffer history and slot reuse"""
+    import pytest
+    pytest.importorskip("ultralytics")
+    from detector import MultiObjectTracker
+
+    print("🎯 Testing tracker history wraparound...")
+    tracker = MultiObjectTracker(max_objects=2, distance_threshold=100)
+    history = tracker.max_history
+    n_updates = history + 10
+
+    # 单个缓慢移动的目标，更新次数超过历史长度
+    for i in range(n_updates):
+        tracker.update([((100 + i, 200), 0.5 + i / 1000)], float(i))
+
+    assert list(tracker.get_tracks()) == [0]
+    track = tracker.get_tracks()[0]
+    assert track['count'] == history
+
+    # 从 write_idx 开始即为时间先后顺序，只保留最近 history 次更新
+    order = np.roll(np.arange(history), -track['write_idx'])
+    kept = np.arange(n_updates - history, n_updates)
+    assert np.array_equal(track['timestamps'][order], kept.astype(float))
+    assert np.array_equal(track['positions'][order], np.stack([100 + kept, np.full(history, 200)], axis=1))
+    assert np.allclose(track['confidences'][order], 0.5 + kept / 1000)
+    assert MultiObjectTracker.last_timestamp(track) == n_updates - 1
+    assert track['created_at'] == 0.0
+    print(f"✅ History keeps the last {history} updates in chronological order")
+
+    print("🎯 Testing track slot reuse...")
+    tracker = MultiObjectTracker(max_objects=2, distance_threshold=100)
+    tracker.update([((100, 100), 0.9), ((800, 800), 0.8)], 0.0)
+    assert tracker._n_tracks == 2
+    assert list(tracker._track_ids[:2]) == [0, 1]
+
+    # 轨迹1持续丢失直到被移除，其槽位被释放
+    t = 0.0
+    for _ in range(tracker.max_missing_frames + 1):
+        t += 1.0
+        tracker.update([((100, 100), 0.9)], t)
+    assert list(tracker.get_tracks()) == [0]
+    assert tracker._n_tracks == 1
+    assert list(tracker._track_ids[:1]) == [0]
+
+    # 新目标占用释放的槽位，后续检测匹配到该新轨迹
+    tracker.update([((100, 100), 0.9), ((400, 400), 0.7)], t + 1.0)
+    assert sorted(tracker.get_tracks()) == [0, 2]
+    assert tracker._n_tracks == 2
+    assert list(tracker._track_ids[:2]) == [0, 2]
+    assert np.array_equal(tracker._last_positions[1], [400, 400])
+
+    tracker.update([((100, 100), 0.9), ((410, 395), 0.7)], t + 2.0)
+    assert tracker.get_tracks()[2]['count'] == 2
+    assert np.array_equal(tracker._last_positions[1], [410, 395])
+    print("✅ Dropped track slot is reused by the next new track")
+
+    return True
+
+def test_buffered_frame_ring():
+    """Test BufferedImageProcessor frame rings (wraparound, None frames, resize)"""
+    import pytest
+    pytest.importorskip("ultralytics")
+    from unittest import mock
+    import detector
+
+    print("🎞️ Testing buffered frame rings...")
+    with mock.patch.object(detector, "YOLO"):
+        processor = detector.BufferedImageProcessor("model.pt", buffer_duration=0.1, fps=30)
+    assert processor.max_buffer_size == 3
+
+    def frame(value, shape=(4, 5, 3)):
+        return np.full(shape, value, dtype=np.uint8)
+
+    received = []
+
+    def callback(detections1, detections2, timestamps, frames1, frames2):
+        received.append((detections1, detections2, timestamps, frames1, frames2))
+
+    def process():
+        # 直接在当前线程运行处理流程，检测替换为空结果
+        processor.processing_callback = callback
+        processor.is_processing = True
+        with mock.patch.object(processor, "_detect_shuttlecocks_batch",
+                               side_effect=lambda frames: [[] for _ in frames]):
+            processor._process_buffered_frames()
+        assert not processor.is_processing
+        return received[-1]
+
+    # 第4帧覆盖最旧的槽位；相机1的第2帧缺失
+    processor.add_frame_pair(frame(10), frame(20), 0.0)
+    processor.add_frame_pair(None, frame(21), 1.0)
+    processor.add_frame_pair(frame(12), frame(22), 2.0)
+    processor.add_frame_pair(frame(13), frame(23), 3.0)
+    assert processor.get_buffer_info()['buffer_size'] == 3
+
+    detections1, detections2, timestamps, frames1, frames2 = process()
+    assert detections1 == [[], [], []] and detections2 == [[], [], []]
+    assert isinstance(timestamps, np.ndarray) and list(timestamps) == [1.0, 2.0, 3.0]
+    assert frames1[0] is None
+    assert [f[0, 0, 0] for f in frames1[1:]] == [12, 13]
+    assert [f[0, 0, 0] for f in frames2] == [21, 22, 23]
+    # 回调收到的是环形数组的视图，不是拷贝
+    assert all(np.shares_memory(f, processor.frame_ring1) for f in frames1[1:])
+    assert all(np.shares_memory(f, processor.frame_ring2) for f in frames2)
+    print("✅ Wraparound keeps chronological order and missing frames stay None")
+
+    # 相机1分辨率变化：重新分配，旧尺寸的帧作废；相机2不受影响
+    old_ring1 = processor.frame_ring1
+    processor.add_frame_pair(frame(14, shape=(6, 5, 3)), frame(24), 4.0)
+    assert processor.frame_ring1 is not old_ring1
+    assert processor.frame_ring1.shape == (3, 6, 5, 3)
+
+    _, _, timestamps, frames1, frames2 = process()
+    assert list(timestamps) == [2.0, 3.0, 4.0]
+    assert frames1[:2] == [None, None]
+    assert frames1[2].shape == (6, 5, 3) and frames1[2][0, 0, 0] == 14
+    assert [f[0, 0, 0] for f in frames2] == [22, 23, 24]
+    print("✅ Frame size change reallocates the ring and drops stale frames")
+
+    # 清空后重新计数
+    processor.clear_buffer()
+    assert processor.get_buffer_info()['buffer_size'] == 0
+
+    return True
+
+def _look_at_camera(position, target=(0.0, 0.0, 100.0)):
+    """Build rotation/translation vectors for a camera at `position` looking at `target` (world z up)"""
+    import cv2
+    position = np.asarray(position, dtype=np.float64)
+    forward = np.asarray(target, dtype=np.float64) - position
+    forward /= np.linalg.norm(forward)
+    right = np.cross(forward, [0.0, 0.0, 1.0])
+    right /= np.linalg.norm(right)
+    down = np.cross(forward, right)
+    R = np.stack([right, down, forward])
+    rvec, _ = cv2.Rodrigues(R)
+    return rvec, -R @ position.reshape(3, 1)
+
+def test_right_court_hull_pruning():
+    """Test that matches outside the right-camera court projection skip triangulation"""
+    import os
+    import tempfile
+    import pytest
+    pytest.importorskip("ultralytics")
+    from unittest import mock
+    import cv2
+    from detector import StereoProcessor, COURT_HULL_MARGIN_PX
+    from utils import save_opencv_yaml
+
+    K = np.array([[800.0, 0.0, 640.0], [0.0, 800.0, 360.0], [0.0, 0.0, 1.0]])
+    dist = np.zeros(5)
+
+    def make_processor(tmp_dir, position2, target2=(0.0, 0.0, 100.0)):
+        files = []
+        for name, position, target in (("cam1", (-600.0, -1500.0, 300.0), (0.0, 0.0, 100.0)),
+                                       ("cam2", position2, target2)):
+            rvec, tvec = _look_at_camera(position, target)
+            path = os.path.join(tmp_dir, f"{name}_{'_'.join(str(int(v)) for v in position)}.yaml")
+            save_opencv_yaml(path, {
+                'camera_matrix': K,
+                'distortion_coefficients': dist,
+                'rotation_vector': rvec,
+                'translation_vector': tvec,
+            })
+            files.append(path)
+        processor = StereoProcessor()
+        assert processor.load_camera_parameters(*files)
+        return processor
+
+    def project(params, points):
+        image_points, _ = cv2.projectPoints(np.asarray(points, dtype=np.float64),
+                                            params['rotation_vector'], params['translation_vector'],
+                                            params['camera_matrix'], params['dist_coeffs'])
+        return [tuple(p) for p in image_points.reshape(-1, 2).tolist()]
+
+    def stereo_pair(processor, right_point, depth=1500.0):
+        # 沿右图点的视线取一个3D点，再投影到左图，得到满足极线约束的点对
+        params = processor.camera2_params
+        ray = params['rotation_matrix'].T @ (np.linalg.inv(K) @ np.array([*right_point, 1.0]))
+        point_3d = params['camera_center'] + depth * ray / np.linalg.norm(ray)
+        return project(processor.camera1_params, [point_3d])[0], right_point
+
+    def run(processor, pairs):
+        detections1 = [[(left, 0.9)] for left, _ in pairs]
+        detections2 = [[(right, 0.9)] for _, right in pairs]
+        with mock.patch.object(processor, "_triangulate_points",
+                               wraps=processor._triangulate_points) as triangulate:
+            points, timestamps = processor.process_batch_detections(
+                detections1, detections2, [float(i) for i in range(len(pairs))])
+        assert triangulate.call_count == 1
+        return points, timestamps, [tuple(p) for p in triangulate.call_args[0][1]]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        processor = make_processor(tmp_dir, (600.0, -1500.0, 300.0))
+
+        # 独立计算场地边界框在右图中的投影凸包，取最长边中点及其外法向
+        bounds = processor.court_bounds
+        corners = [[x, y, z] for x in (bounds['x_min'], bounds['x_max'])
+                   for y in (bounds['y_min'], bounds['y_max'])
+                   for z in (bounds['z_min'], bounds['z_max'])]
+        hull = cv2.convexHull(np.float32(project(processor.camera2_params, corners))).reshape(-1, 2)
+        edges = np.roll(hull, -1, axis=0) - hull
+        k = np.argmax(np.linalg.norm(edges, axis=1))
+        midpoint = hull[k] + edges[k] / 2
+        normal = np.array([edges[k][1], -edges[k][0]]) / np.linalg.norm(edges[k])
+        if np.dot(normal, midpoint - hull.mean(axis=0)) < 0:
+            normal = -normal
+
+        in_court = (100.0, 200.0, 150.0)
+        far_lateral = (3000.0, 0.0, 100.0)
+        pairs = [
+            tuple(project(processor.camera1_params, [in_court]) + project(processor.camera2_params, [in_court])),
+            tuple(project(processor.camera1_params, [far_lateral]) + project(processor.camera2_params, [far_lateral])),
+            stereo_pair(processor, tuple(midpoint + (COURT_HULL_MARGIN_PX - 1) * normal)),
+            stereo_pair(processor, tuple(midpoint + (COURT_HULL_MARGIN_PX + 1) * normal)),
+        ]
+
+        print("🏟️ Testing triangulation short-circuit...")
+        points, timestamps, triangulated_right = run(processor, pairs)
+        assert triangulated_right == pytest.approx([pairs[0][1], pairs[2][1]], abs=1e-3)
+        assert 0.0 in timestamps
+        assert np.allclose(points[timestamps.index(0.0)], in_court, atol=5.0)
+
+        debug_data = processor.get_debug_data()
+        pruned = debug_data['pruned_points']
+        assert [p['frame_index'] for p in pruned] == [1, 3]
+        assert all(p['reason'] == 'outside_court_projection' and 'point_3d' not in p for p in pruned)
+        assert all(p['frame_index'] not in (1, 3) for p in debug_data['rejected_points'])
+        assert all(p['reason'] == 'out_of_bounds' for p in debug_data['rejected_points'])
+        print("✅ Pairs beyond the hull margin are pruned before triangulation, pairs within it are kept")
+
+        print("🏟️ Testing behind-camera skip...")
+        # 右相机位于场地边界框内，部分角点在其后方，不做提前剔除
+        processor = make_processor(tmp_dir, (0.0, 0.0, 300.0), target2=(0.0, 900.0, 100.0))
+        pairs = [
+            tuple(project(processor.camera1_params, [p]) + project(processor.camera2_params, [p]))
+            for p in ((100.0, 400.0, 150.0), far_lateral)
+        ]
+        _, _, triangulated_right = run(processor, pairs)
+        assert triangulated_right == pytest.approx([right for _, right in pairs], abs=1e-3)
+        assert processor.pruned_points == []
+        assert [p['reason'] for p in processor.rejected_points] == ['out_of_bounds']
+        print("✅ Every pair is triangulated when a court corner is behind the right camera")
+
+    return True
+
 def main():
     """Run all tests"""
     print("=" * 70)
@@ -132,6 +378,9 @@ def main():
         ("Video Controls & Progress Bar", test_video_controls_import),
         ("Multi-Object Tracking", test_multi_object_tracking),
         ("Maximum Speed Calculation", test_max_speed_calculation),
+        ("Tracker Ring History", test_tracker_ring_history),
+        ("Buffered Frame Ring", test_buffered_frame_ring),
+        ("Right Court Hull Pruning", test_right_court_hull_pruning),
     ]
     
     results = []
@@ -1,8 +1,14 @@
 import os
 import time
+from functools import lru_cache
 import cv2
 import numpy as np
 
+try:
+    import yaml  # 可选依赖：缺失时参数文件读取回退到cv2.FileStorage
+except ImportError:
+    yaml = None
+
 
 class Config:
     """配置类,集中管理所有系统参数"""
@@ -173,8 +179,23 @@ class UIHelper:
         cv2.destroyWindow("Badminton Analysis System v5.0")
 
     @staticmethod
-    def display_help_screen():
-        """显示帮助界面 - 更新空格键功能说明"""
+    def toggle_help_screen():
+        """切换帮助界面 - 非阻塞显示，不等待按键，主循环继续处理视频"""
+        try:
+            visible = cv2.getWindowProperty("Help & Instructions", cv2.WND_PROP_VISIBLE) >= 1
+        except cv2.error:
+            visible = False
+
+        if visible:
+            cv2.destroyWindow("Help & Instructions")
+        else:
+            cv2.namedWindow("Help & Instructions", cv2.WINDOW_NORMAL)
+            cv2.imshow("Help & Instructions", UIHelper._render_help_screen())
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _render_help_screen():
+        """绘制帮助界面（内容固定，只在首次按H时渲染一次，返回只读图像）"""
         help_screen = np.zeros((800, 1280, 3), dtype=np.uint8)
 
         # 标题
@@ -248,12 +269,101 @@ class UIHelper:
             cv2.putText(help_screen, shortcut, (180, y_offset + i * 20),
                         cv2.FONT_HERSHEY_SIMPLEX, font_size, color, 1)
 
-        cv2.putText(help_screen, "Press any key to continue...",
+        cv2.putText(help_screen, "Press H again to close...",
                     (520, 770), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
 
-        cv2.namedWindow("Help & Instructions", cv2.WINDOW_NORMAL)
-        cv2.imshow("Help & Instructions", help_screen)
-        cv2.waitKey(0)
-        cv2.destroyWindow("Help & Instructions")
+        help_screen.flags.writeable = False
+        return help_screen
+
+
+# OpenCV矩阵元素类型代码与numpy类型的对应关系
+_OPENCV_DTYPES = {
+    'u': np.uint8, 'c': np.int8, 'w': np.uint16, 's': np.int16,
+    'i': np.int32, 'f': np.float32, 'd': np.float64
+}
+_OPENCV_DTYPE_CODES = {np.dtype(v): k for k, v in _OPENCV_DTYPES.items()}
+_OPENCV_MATRIX_TAG = 'tag:yaml.org,2002:opencv-matrix'
+
+
+def _construct_opencv_matrix(loader, node):
+    m = loader.construct_mapping(node, deep=True)
+    dtype = _OPENCV_DTYPES.get(m.get('dt', 'd'), np.float64)
+    shape = m['sizes'] if 'sizes' in m else (m['rows'], m['cols'])
+    return np.asarray(m['data'], dtype=dtype).reshape(shape)
+
+
+if yaml is not None:
+    class _OpenCVYamlLoader(yaml.SafeLoader):
+        """解析OpenCV FileStorage YAML格式（!!opencv-matrix）"""
+
+    _OpenCVYamlLoader.add_constructor(_OPENCV_MATRIX_TAG, _construct_opencv_matrix)
+    _OpenCVYamlLoader.add_constructor('tag:yaml.org,2002:opencv-nd-matrix', _construct_opencv_matrix)
+
+
+def _load_with_filestorage(params_file):
+    """使用cv2.FileStorage读取参数文件（XML或非标准YAML的回退路径）"""
+    fs = cv2.FileStorage(params_file, cv2.FILE_STORAGE_READ)
+    data = {}
+    for key in fs.root().keys():
+        node = fs.getNode(key)
+        if node.isString():
+            data[key] = node.string()
+        elif node.isInt():
+            data[key] = int(node.real())
+        elif node.isReal():
+            data[key] = node.real()
+        else:
+            data[key] = node.mat()
+    fs.release()
+    return data
+
+
+def load_opencv_yaml(params_file):
+    """
+    读取OpenCV FileStorage格式的参数文件
+
+    安装了PyYAML时小型YAML参数文件直接解析，矩阵节点返回numpy数组；
+    未安装PyYAML、XML文件或解析失败时回退到cv2.FileStorage。
+    """
+    if yaml is not None and params_file.lower().endswith(('.yaml', '.yml')):
+        try:
+            with open(params_file, 'r', encoding='utf-8') as f:
+                text = f.read()
+            # OpenCV写入的 "%YAML:1.0" / "%YAML 1.2" 指令PyYAML不接受，解析前去掉
+            if text.startswith('%YAML'):
+                text = text.split('\n', 1)[1]
+            data = yaml.load(text, Loader=_OpenCVYamlLoader)
+            if isinstance(data, dict):
+                return data
+        except (OSError, yaml.YAMLError, KeyError, ValueError) as e:
+            print(f"⚠️ Direct YAML parse failed, falling back to cv2.FileStorage: {e}")
+
+    return _load_with_filestorage(params_file)
+
+
+def save_opencv_yaml(params_file, data):
+    """以OpenCV FileStorage兼容的YAML格式保存参数（numpy数组写为 !!opencv-matrix，一维数组写为单列矩阵；不依赖PyYAML）"""
+    lines = ['%YAML:1.0', '---']
+    for key, value in data.items():
+        if isinstance(value, np.ndarray):
+            matrix = value if value.ndim == 2 else value.reshape(-1, 1)
+            values = ', '.join(repr(v) for v in matrix.flatten().tolist())
+            lines += [f'{key}: !!opencv-matrix',
+                      f'   rows: {matrix.shape[0]}',
+                      f'   cols: {matrix.shape[1]}',
+                      f'   dt: {_OPENCV_DTYPE_CODES.get(matrix.dtype, "d")}',
+                      f'   data: [ {values} ]']
+        elif isinstance(value, str):
+            lines.append(f'{key}: "{value}"')
+        else:
+            lines.append(f'{key}: {value.item() if isinstance(value, np.generic) else value}')
+
+    # 先写临时文件再原子替换，避免中途中断留下截断的参数文件
+    tmp_file = f'{params_file}.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp_file, params_file)
+
+
 # 创建全局配置实例
 config = Config()
\ No newline at end of file
@@ -1,6 +1,5 @@
 import cv2
 import numpy as np
-import math
 
 
 class VideoProgressBar:
@@ -84,8 +83,11 @@ class VideoProgressBar:
     def _is_point_in_handle(self, x, y):
         """检查点是否在把手内"""
         handle_y = self.bar_y + self.bar_height // 2
-        distance = math.sqrt((x - self.handle_x) ** 2 + (y - handle_y) ** 2)
-        return distance <= self.handle_radius + 20  # 增加一些容差
+        # 比较距离平方，省去每次鼠标事件的开方
+        hit_radius = self.handle_radius + 20  # 增加一些容差
+        dx = x - self.handle_x
+        dy = y - handle_y
+        return dx * dx + dy * dy <= hit_radius * hit_radius
     
     def _is_point_in_bar(self, x, y):
         """检查点是否在进度条内"""
@@ -115,10 +117,14 @@ class VideoProgressBar:
             return self.current_frame / self.fps
         return 0
     
-    def render(self):
-        """渲染进度条"""
+    def render(self, out=None):
+        """渲染进度条（提供out时直接绘制到该区域）"""
         # 创建进度条图像
-        img = np.full((self.height, self.width, 3), self.bg_color, dtype=np.uint8)
+        if out is None:
+            img = np.full((self.height, self.width, 3), self.bg_color, dtype=np.uint8)
+        else:
+            img = out
+            img[:] = self.bg_color
         
         # 绘制进度条轨道
         cv2.rectangle(img, 
@@ -175,8 +181,12 @@ class EnhancedVideoControls:
     
     def __init__(self, video_width=1280):
         self.video_width = video_width
-        self.progress_bar = VideoProgressBar(width=video_width-20, height=60)
+        # 进度条按合成画面宽度直接渲染，避免每帧再拉伸一次（边距由进度条自身的margin提供）
+        self.progress_bar = VideoProgressBar(width=video_width, height=60)
         self.mouse_callback_set = False
+
+        # 组合画面缓冲区，尺寸不变时每帧复用
+        self._canvas = None
         
         # 播放控制状态
         self.playing = True
@@ -217,30 +227,31 @@ class EnhancedVideoControls:
         if video_frame is None:
             return None
 
-        # 渲染进度条
-        progress_img = self.progress_bar.render()
-
         # 调整视频帧大小以匹配控制面板宽度
         video_height, video_width = video_frame.shape[:2]
         target_width = self.video_width
         target_height = int(video_height * target_width / video_width)
 
-        video_resized = cv2.resize(video_frame, (target_width, target_height))
-
-        # 如果进度条宽度与目标宽度不匹配，调整进度条大小
-        if progress_img.shape[1] != target_width:
-            progress_img = cv2.resize(progress_img, (target_width, progress_img.shape[0]))
+        # 垂直组合视频和控制面板（两部分恰好铺满，无需预先清零），尺寸变化时才重新分配
+        progress_height = self.progress_bar.height
+        canvas_shape = (target_height + progress_height, target_width, 3)
+        if self._canvas is None or self._canvas.shape != canvas_shape:
+            self._canvas = np.empty(canvas_shape, dtype=np.uint8)
+        combined = self._canvas
 
-        # 垂直组合视频和控制面板
-        combined_height = target_height + progress_img.shape[0]
-        combined = np.zeros((combined_height, target_width, 3), dtype=np.uint8)
-
-        # 放置视频
-        combined[:target_height, :target_width] = video_resized
+        # 放置视频：尺寸一致时直接拷贝，否则直接缩放到目标区域，不产生中间图像
+        video_region = combined[:target_height]
+        if (video_width, video_height) == (target_width, target_height):
+            video_region[:] = video_frame
+        else:
+            cv2.resize(video_frame, (target_width, target_height), dst=video_region)
 
-        # 放置进度条
-        progress_height = progress_img.shape[0]
-        combined[target_height:target_height + progress_height, :target_width] = progress_img
+        # 放置进度条：宽度匹配时直接绘制到画布，否则渲染后缩放
+        progress_region = combined[target_height:]
+        if self.progress_bar.width == target_width:
+            self.progress_bar.render(out=progress_region)
+        else:
+            cv2.resize(self.progress_bar.render(), (target_width, progress_height), dst=progress_region)
 
         return combined
     
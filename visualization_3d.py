@@ -2,7 +2,18 @@ import threading
 import time
 import copy
 import numpy as np
-import open3d as o3d
+
+# open3d导入开销大，首次打开3D窗口时才加载（见 _load_open3d）
+o3d = None
+
+
+def _load_open3d():
+    """Import open3d on first use so sessions that never open the 3D window skip it"""
+    global o3d
+    if o3d is None:
+        import open3d
+        o3d = open3d
+    return o3d
 
 
 class Interactive3DVisualizer:
@@ -55,6 +66,7 @@ class Interactive3DVisualizer:
         self.last_update_time = 0
         self.update_interval = 1.0 / 20.0
         self.needs_geometry_update = False
+        self.needs_render = False  # 几何体或视角由代码修改后需要重新渲染
         self.geometry_update_lock = threading.Lock()
 
         print(f"Enhanced 3D Visualizer initialized at {time.strftime('%Y-%m-%d %H:%M:%S')} UTC")
@@ -90,7 +102,7 @@ class Interactive3DVisualizer:
                 self._cleanup_visualizer()
 
             # Create fresh visualizer instance
-            self.vis = o3d.visualization.Visualizer()
+            self.vis = _load_open3d().visualization.Visualizer()
 
             # Create window with error handling
             success = self.vis.create_window(
@@ -129,6 +141,7 @@ class Interactive3DVisualizer:
             view_set = self._set_initial_view_with_retry()
 
             # Update window state
+            self.needs_render = True
             self.window_created = True
             self.window_visible = True
             self.window_should_close = False
@@ -532,6 +545,7 @@ class Interactive3DVisualizer:
                 if self.needs_geometry_update:
                     self._update_all_geometries()
                     self.needs_geometry_update = False
+                    self.needs_render = True
 
             # Poll events with error handling
             events_ok = self.vis.poll_events()
@@ -540,8 +554,10 @@ class Interactive3DVisualizer:
                 self.close_window()
                 return True
 
-            # Update renderer
-            self.vis.update_renderer()
+            # Update renderer only when content changed; mouse interaction redraws inside poll_events
+            if self.needs_render:
+                self.vis.update_renderer()
+                self.needs_render = False
             self.last_update_time = current_time
             return True
 